@@ -1,11 +1,10 @@
 import random
 import logging
-from database import get_all_recipes, get_flavor_pairs
-
-logging.basicConfig(level=logging.DEBUG)
+from database import get_flavor_pairs
+from recipe_catalog import get_recipes
 
 def match_predefined_recipe(ingredients, language):
-    recipes = get_all_recipes()
+    recipes = get_recipes()
     for recipe in recipes:
         if set(ingredients).issubset(set(recipe['ingredients'])):
             return {
@@ -157,14 +156,14 @@ def generate_dynamic_recipe(ingredients, preferences):
     }
 
 def generate_random_recipe(language):
-    recipes = get_all_recipes()
+    recipes = get_recipes()
     if not recipes:
         logging.error("No recipes found in database")
         return {"error": "No recipes available in the database"}
     
-    logging.debug(f"Retrieved {len(recipes)} recipes from database")
+    logging.debug("Retrieved %s recipes from database", len(recipes))
     random_recipe = random.choice(recipes)
-    logging.debug(f"Selected random recipe: {random_recipe}")
+    logging.debug("Selected random recipe: %s", random_recipe)
     
     return {
         "id": random_recipe.get('id', 0),
@@ -1,57 +1,71 @@
+import hmac
 import logging
+import multiprocessing
 import os
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from flask_caching import Cache
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-from recipe_generator import match_predefined_recipe, generate_dynamic_recipe, generate_random_recipe
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from types import MappingProxyType
+from recipe_generator import match_predefined_recipe, match_predefined_recipes, generate_dynamic_recipe, generate_random_recipe
 from helpers import validate_input, calculate_nutrition, generate_share_text
-from database import init_db, get_all_recipes
+from database import init_db, pool_stats, search_recipes, get_similar
+from pairings import FLAVOR_PAIRS, INGREDIENT_PAIRS
+from similarity import merge_pairs, start_refresher, SIMILAR_K
+from recipe_catalog import get_catalog
+from scoring import ScoringEngine, is_valid_random_recipe
+from scoring_pool import ScoringPool, SCORING_PROCESSES
+from sampling import AliasSampler
+from http_cache import PrecomputedJSON, add_strong_etag
+from streaming import wants_ndjson, ndjson_response
+from services.caching_service import get_cached_recipe, cache_recipe, cache_stats
+from recipe_request import get_recipe_request, canonicalize_batch, canonicalize_ratings, RecipeRequestError
+from ratings import record_rating, rating_stats, rating_weight, live_rating
+from profiling import profiled, is_admin, get_profile, profile_stats, set_sample_every
+from metrics import start_timing, stage, label_request, finish_timing, prometheus_text, stage_stats, PROMETHEUS_CONTENT_TYPE
+from logging_setup import configure_logging
 from dotenv import load_dotenv
 from fuzzywuzzy import fuzz
 import random
 
-# Configure logging
-logging.basicConfig(
-    filename='recipe_generator.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s - %(pathname)s:%(lineno)d',
-    force=True
-)
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-logging.getLogger('').addHandler(console_handler)
-werkzeug_logger = logging.getLogger('werkzeug')
-werkzeug_logger.setLevel(logging.ERROR)
-werkzeug_logger.propagate = False
-
 load_dotenv()
+configure_logging()
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "your-secret-key")
 CORS(app, resources={
     r"/generate_recipe": {"origins": ["*"], "methods": ["GET", "POST", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
-    r"/ingredients": {"origins": ["*"], "methods": ["GET", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
+    r"/generate_recipes": {"origins": ["*"], "methods": ["POST", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
+    r"/ingredients": {"origins": ["*"], "methods": ["GET", "OPTIONS"], "allow_headers": ["Content-Type", "Origin", "If-None-Match"], "expose_headers": ["ETag"]},
+    r"/search": {"origins": ["*"], "methods": ["GET", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
+    r"/rate": {"origins": ["*"], "methods": ["POST", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
+    r"/recipes/*": {"origins": ["*"], "methods": ["GET"]},
     r"/api": {"origins": ["*"], "methods": ["GET"]}
 }, supports_credentials=True)
 
 limiter = Limiter(get_remote_address, app=app, default_limits=["100 per day", "20 per minute"], storage_uri="memory://")
-cache = Cache(app, config={'CACHE_TYPE': 'simple'})
-executor = ThreadPoolExecutor(max_workers=4)
+# Load tests send this token in X-Load-Test-Token to skip rate limiting; unset means no bypass
+LOAD_TEST_TOKEN = os.getenv("LOAD_TEST_TOKEN", "")
+
+@limiter.request_filter
+def is_load_test():
+    return bool(LOAD_TEST_TOKEN) and hmac.compare_digest(request.headers.get('X-Load-Test-Token', '').encode('utf-8'), LOAD_TEST_TOKEN.encode('utf-8'))
+
+app.teardown_request(finish_timing)
+executor = ThreadPoolExecutor(max_workers=int(os.getenv("WORKER_THREADS", "8")), thread_name_prefix="recipe-worker")
+SEARCH_MAX_PER_PAGE = int(os.getenv("SEARCH_MAX_PER_PAGE", "50"))
 
 try:
     init_db()
     logging.info("Database initialized successfully")
 except Exception as e:
-    logging.error(f"Failed to initialize database: {str(e)}", exc_info=True)
+    logging.error("Failed to initialize database: %s", e, exc_info=True)
 
-ALL_RECIPES = get_all_recipes()
-logging.debug(f"Loaded {len(ALL_RECIPES)} recipes from database: {ALL_RECIPES[:2] if ALL_RECIPES else []}")
-if not ALL_RECIPES or not isinstance(ALL_RECIPES, list):
-    logging.warning("ALL_RECIPES is invalid or empty; falling back to dynamic generation")
-    ALL_RECIPES = []
+catalog = get_catalog()
+if not catalog.get_recipes():
+    logging.warning("Recipe catalog is empty; falling back to dynamic generation")
 
 COOKING_METHODS = ["Grill", "Fry", "Bake", "Boil", "Sauté", "Roast", "Simmer"]
 EQUIPMENT_OPTIONS = ["skillet", "pot", "grill", "oven", "mixing bowl", "tongs", "spatula", "knife"]
@@ -62,15 +76,6 @@ SPICES_AND_EXTRAS = ["1 tsp salt", "1/2 tsp black pepper", "1 tbsp paprika", "1
 CHAOS_TIPS = ["Spill a splash of beer for extra sizzle!", "Holler at it to tenderize!", "Bribe the neighbors with a plate if they sniff around!"]
 INSULTS = ["Tastier than roadkill!", "Even yer cousin’d eat it!", "Good enough for the barn!"]
 
-INGREDIENT_PAIRS = {
-    "ground beef": ["beer", "onion", "cheese"],
-    "chicken": ["lemon", "butter", "rice"],
-    "pork": ["apple", "whiskey", "potato"],
-    "salmon": ["lemon", "butter", "vodka"],
-    "moonshine": ["ground beef", "pork", "chicken"],
-    "beer": ["ground beef", "chicken", "bread"]
-}
-
 METHOD_PREFERENCES = {
     "tequila": ["Grill"],
     "moonshine": ["Fry"],
@@ -112,6 +117,47 @@ def score_recipe(recipe, ingredients, preferences):
                         score += 0.2
     return score
 
+def _random_candidates(recipes):
+    return [r for r in recipes if is_valid_random_recipe(r)]
+
+def _build_random_sampler(candidates, ratings):
+    return AliasSampler(candidates, [rating_weight(*ratings.get(r['id'], (r.get('rating'), r.get('rating_count')))) for r in candidates])
+
+def get_random_candidates():
+    return catalog.snapshot().derived('random_candidates', _random_candidates)
+
+def get_random_sampler():
+    """Rating-weighted alias sampler over the valid recipes, rebuilt only when the catalog or its ratings change."""
+    snapshot = catalog.snapshot()
+    candidates = snapshot.derived('random_candidates', _random_candidates)
+    return snapshot.ratings.derived('random_sampler', lambda ratings: _build_random_sampler(candidates, ratings))
+
+def get_scoring_engine():
+    return catalog.snapshot().derived('scoring_engine', lambda recipes: ScoringEngine(_random_candidates(recipes), INGREDIENT_PAIRS))
+
+scoring_pool = ScoringPool(SCORING_PROCESSES, INGREDIENT_PAIRS) if SCORING_PROCESSES > 0 else None
+# Spawned pool workers re-import __main__; only the serving process starts the pool
+if scoring_pool and multiprocessing.parent_process() is None:
+    scoring_pool.start()
+
+if multiprocessing.parent_process() is None:
+    start_refresher(merge_pairs(FLAVOR_PAIRS, INGREDIENT_PAIRS))
+
+def rank_random_candidates(ingredients, k, rng=random):
+    """The k best scoring valid recipes, and whether that ranking is exact.
+
+    With a scoring pool the ranking runs out of process; when it misses its
+    deadline a random sample of candidates stands in so latency stays bounded.
+    """
+    if scoring_pool is None:
+        return get_scoring_engine().top(ingredients, k), True
+    by_id = catalog.snapshot().by_id
+    ranked = [by_id[recipe_id] for recipe_id in scoring_pool.rank(ingredients, k) or () if recipe_id in by_id]
+    if ranked:
+        return ranked, True
+    logging.warning("Scoring pool unavailable; sampling random candidates")
+    return get_random_sampler().sample_distinct(rng, k), False
+
 AMAZON_ASINS = {
     "ground beef": "B08J4K9L2P",
     "chicken": "B07Z8J9K7L",
@@ -119,161 +165,151 @@ AMAZON_ASINS = {
     "squirrel": "B07K9M8N2P",
 }
 
+ERROR_RECIPE = {"title": "Error Recipe", "ingredients": [], "steps": ["Something went wrong!"], "nutrition": {"calories": 0}}
+
+def build_recipe_core(recipe):
+    """Deterministic half of process_recipe: ingredient lines, shopping links and nutrition.
+
+    The result depends only on the input recipe, so it can be cached and
+    decorated many times.
+    """
+    core = dict(recipe)
+    input_ingredients = core.get('input_ingredients', core.get('ingredients', []))
+    # Use recipe['ingredients'] if input_ingredients is empty
+    if not input_ingredients and 'ingredients' in core:
+        input_ingredients = core['ingredients']
+
+    # Realistic ingredients with varied measurements
+    ingredients_list = []
+    nutrition_items = []
+    for ing in input_ingredients:
+        info = INGREDIENT_LOOKUP.get(ing) if isinstance(ing, str) else None
+        meas, prep = (info.measurement, info.prep) if info else ("1 unit", "")
+        ingredients_list.append(f"{meas} {ing}" + (f", {prep}" if prep else ""))
+        nutrition_items.append(ing)
+    if not ingredients_list:
+        ingredients_list = ["1 unit unknown grub"]
+        nutrition_items = ["unknown"]
+    ingredients_list.append("1 tbsp oil, for cooking")  # Add practical oil
+
+    core['ingredients_with_links'] = [
+        {"name": ing, "url": f"https://www.amazon.com/dp/{AMAZON_ASINS.get(ing.split()[-1], 'B08J4K9L2P')}?tag=bshoemak-20"}
+        for ing in ingredients_list
+    ]
+    core['add_all_to_cart'] = f"https://www.amazon.com/gp/aws/cart/add.html?AssociateTag=bshoemak-20&" + "&".join(
+        [f"ASIN.{i+1}={AMAZON_ASINS.get(ing.split()[-1], 'B08J4K9L2P')}&Quantity.{i+1}=1" for i, ing in enumerate(ingredients_list)]
+    )
+    core['ingredients'] = ingredients_list
+    # Cooking methods favoured by the inputs, consumed by decorate_recipe
+    core['_method_preferences'] = [METHOD_PREFERENCES[ing] for ing in input_ingredients if ing in METHOD_PREFERENCES]
+
+    # Realistic nutrition
+    nutrition = {"calories": 0, "protein": 0, "fat": 0, "carbs": 0}
+    for item in nutrition_items:
+        info = INGREDIENT_LOOKUP.get(item) if isinstance(item, str) else None
+        if info:
+            for key, amount in info.nutrition.items():
+                nutrition[key] += amount
+    nutrition["calories"] = max(100, nutrition["calories"])  # Ensure non-zero
+    nutrition["chaos_factor"] = 7
+    core['nutrition'] = nutrition
+
+    # Remove all Spanish fields
+    for key in ['title_es', 'steps_es']:
+        core.pop(key, None)
+    return core
+
+def decorate_recipe(core, rng=random):
+    """Randomized half of process_recipe: title, method, gear, steps and jokes on top of a core.
+
+    All randomness comes from rng, so a seeded random.Random gives reproducible output.
+    """
+    recipe = dict(core)
+    ingredients_list = recipe['ingredients']
+
+    method = rng.choice(COOKING_METHODS)
+    for options in recipe.pop('_method_preferences', []):
+        method = rng.choice(options + [method])
+
+    prefix = rng.choice(FUNNY_PREFIXES)
+    suffix = rng.choice(FUNNY_SUFFIXES)
+    extras = rng.sample(SPICES_AND_EXTRAS, k=rng.randint(1, 2))
+    extra_text = f"{', '.join(extras)}" if extras else "a pinch of salt"
+
+    title_items = [ing.split()[-1].capitalize() for ing in ingredients_list if "oil" not in ing][:2] or ["Mystery"]
+    recipe['title'] = f"{prefix} {method} {' and '.join(title_items)} {suffix}"
+
+    equipment = rng.sample(EQUIPMENT_OPTIONS, k=3)
+    quirky_gear = rng.choice(EQUIPMENT_QUIRKY)
+    primary_equipment = equipment[0]
+
+    chaos_tip = rng.choice(CHAOS_TIPS)
+    insult = rng.choice(INSULTS)
+
+    steps_key = 'steps'
+    heat = "medium heat"
+    time = "8-12 minutes"
+    if method in ["Grill", "Fry", "Sauté"]:
+        heat = "medium-high heat"
+        time = "6-10 minutes"
+    elif method == "Bake":
+        heat = "350°F"
+        time = "15-20 minutes"
+    elif method == "Boil":
+        heat = "boiling water"
+        time = "10-15 minutes"
+
+    if steps_key in recipe and recipe[steps_key] and len(recipe[steps_key]) >= 3:
+        recipe['steps'] = [
+            f"Prep: {recipe[steps_key][0].replace('Cook', 'Chop or prep')}.",
+            f"{method} in {primary_equipment} over {heat} for {time}, stirring occasionally.",
+            f"Serve hot with {extra_text} and a side of cornbread or salad. {insult}"
+        ]
+    else:
+        template = rng.choice(RECIPE_TEMPLATES)
+        recipe['steps'] = [
+            template[0].format(ingredients=' and '.join(ingredients_list[:2]), extra=extra_text, equipment=primary_equipment),
+            template[1].format(method=method.lower(), equipment=primary_equipment, heat=heat, time=time),
+            template[2].format(**({'extra': extra_text} if '{extra}' in template[2] else {})) + f" {insult}"
+        ]
+
+    recipe['steps'].append(f"Chaos Tip: {chaos_tip}")
+    recipe['equipment'] = equipment
+    recipe['chaos_gear'] = quirky_gear
+
+    recipe['shareText'] = f"Behold my culinary chaos: {recipe['title']}\nGear: {', '.join(equipment)}\nChaos Gear: {quirky_gear}\nGrub: {', '.join(ingredients_list)}\nSteps:\n{' '.join(recipe['steps'])}\nCalories: {recipe['nutrition']['calories']} (Chaos: {recipe['nutrition']['chaos_factor']}/10)"
+    return recipe
+
 def process_recipe(recipe):
     try:
-        logging.debug(f"Starting process_recipe with input: {recipe}")
-        input_ingredients = recipe.get('input_ingredients', recipe.get('ingredients', []))
-        # Use recipe['ingredients'] if input_ingredients is empty
-        if not input_ingredients and 'ingredients' in recipe:
-            input_ingredients = recipe['ingredients']
-        
-        method = random.choice(COOKING_METHODS)
-        for ing in input_ingredients:
-            if ing in METHOD_PREFERENCES:
-                method = random.choice(METHOD_PREFERENCES[ing] + [method])
-        
-        prefix = random.choice(FUNNY_PREFIXES)
-        suffix = random.choice(FUNNY_SUFFIXES)
-        extras = random.sample(SPICES_AND_EXTRAS, k=random.randint(1, 2))
-        extra_text = f"{', '.join(extras)}" if extras else "a pinch of salt"
-        
-        # Realistic ingredients with varied measurements
-        measurements = {
-            "meat": ["1 lb", "cubed"],
-            "vegetables": ["2 medium", "diced"],
-            "fruits": ["1 cup", "sliced"],
-            "seafood": ["1 lb", "cleaned"],
-            "dairy": ["2 tbsp", "melted"],
-            "bread_carbs": ["1 cup", "cooked"],
-            "devil_water": ["1/2 cup", ""]
-        }
-        ingredients_list = []
-        nutrition_items = []
-        for ing in input_ingredients:
-            meas = "1 unit"
-            prep = ""
-            for cat, items in INGREDIENT_CATEGORIES.items():
-                if ing in [item['name'] for item in items]:
-                    meas, prep = measurements.get(cat, ["1 unit", ""])
-                    break
-            ingredients_list.append(f"{meas} {ing}" + (f", {prep}" if prep else ""))
-            nutrition_items.append(ing)
-        if not ingredients_list:
-            ingredients_list = ["1 unit unknown grub"]
-            nutrition_items = ["unknown"]
-        ingredients_list.append("1 tbsp oil, for cooking")  # Add practical oil
-        
-        title_items = [ing.split()[-1].capitalize() for ing in ingredients_list if "oil" not in ing][:2] or ["Mystery"]
-        recipe['title'] = f"{prefix} {method} {' and '.join(title_items)} {suffix}"
-        
-        recipe['ingredients_with_links'] = [
-            {"name": ing, "url": f"https://www.amazon.com/dp/{AMAZON_ASINS.get(ing.split()[-1], 'B08J4K9L2P')}?tag=bshoemak-20"}
-            for ing in ingredients_list
-        ]
-        recipe['add_all_to_cart'] = f"https://www.amazon.com/gp/aws/cart/add.html?AssociateTag=bshoemak-20&" + "&".join(
-            [f"ASIN.{i+1}={AMAZON_ASINS.get(ing.split()[-1], 'B08J4K9L2P')}&Quantity.{i+1}=1" for i, ing in enumerate(ingredients_list)]
-        )
-        
-        equipment = random.sample(EQUIPMENT_OPTIONS, k=3)
-        quirky_gear = random.choice(EQUIPMENT_QUIRKY)
-        primary_equipment = equipment[0]
-        
-        chaos_tip = random.choice(CHAOS_TIPS)
-        insult = random.choice(INSULTS)
-        
-        steps_key = 'steps'
-        heat = "medium heat"
-        time = "8-12 minutes"
-        if method in ["Grill", "Fry", "Sauté"]:
-            heat = "medium-high heat"
-            time = "6-10 minutes"
-        elif method == "Bake":
-            heat = "350°F"
-            time = "15-20 minutes"
-        elif method == "Boil":
-            heat = "boiling water"
-            time = "10-15 minutes"
-        
-        if steps_key in recipe and recipe[steps_key] and len(recipe[steps_key]) >= 3:
-            recipe['steps'] = [
-                f"Prep: {recipe[steps_key][0].replace('Cook', 'Chop or prep')}.",
-                f"{method} in {primary_equipment} over {heat} for {time}, stirring occasionally.",
-                f"Serve hot with {extra_text} and a side of cornbread or salad. {insult}"
-            ]
-        else:
-            template = random.choice(RECIPE_TEMPLATES)
-            logging.debug(f"Using template: {template}")
-            recipe['steps'] = [
-                template[0].format(ingredients=' and '.join(ingredients_list[:2]), extra=extra_text, equipment=primary_equipment),
-                template[1].format(method=method.lower(), equipment=primary_equipment, heat=heat, time=time),
-                template[2].format(**({'extra': extra_text} if '{extra}' in template[2] else {})) + f" {insult}"
-            ]
-        
-        recipe['steps'].append(f"Chaos Tip: {chaos_tip}")
-        recipe['ingredients'] = ingredients_list
-        recipe['equipment'] = equipment
-        recipe['chaos_gear'] = quirky_gear
-        
-        # Realistic nutrition
-        nutrition = {"calories": 0, "protein": 0, "fat": 0, "carbs": 0}
-        for item in nutrition_items:
-            if item in [i['name'] for i in INGREDIENT_CATEGORIES['meat'] + INGREDIENT_CATEGORIES['seafood']]:
-                nutrition["calories"] += 800
-                nutrition["protein"] += 60
-                nutrition["fat"] += 40
-            elif item in [i['name'] for i in INGREDIENT_CATEGORIES['vegetables']]:
-                nutrition["calories"] += 100
-                nutrition["carbs"] += 20
-            elif item in [i['name'] for i in INGREDIENT_CATEGORIES['bread_carbs']]:
-                nutrition["calories"] += 200
-                nutrition["carbs"] += 40
-            elif item in [i['name'] for i in INGREDIENT_CATEGORIES['dairy']]:
-                nutrition["calories"] += 150
-                nutrition["fat"] += 10
-            elif item in [i['name'] for i in INGREDIENT_CATEGORIES['fruits']]:
-                nutrition["calories"] += 80
-                nutrition["carbs"] += 15
-            elif item in [i['name'] for i in INGREDIENT_CATEGORIES['devil_water']]:
-                nutrition["calories"] += 100
-        nutrition["calories"] = max(100, nutrition["calories"])  # Ensure non-zero
-        nutrition["chaos_factor"] = 7
-        recipe['nutrition'] = nutrition
-        
-        recipe['shareText'] = f"Behold my culinary chaos: {recipe['title']}\nGear: {', '.join(equipment)}\nChaos Gear: {quirky_gear}\nGrub: {', '.join(ingredients_list)}\nSteps:\n{' '.join(recipe['steps'])}\nCalories: {recipe['nutrition']['calories']} (Chaos: {recipe['nutrition']['chaos_factor']}/10)"
-        
-        # Remove all Spanish fields
-        for key in ['title_es', 'steps_es']:
-            recipe.pop(key, None)
-        
-        logging.debug(f"Processed recipe successfully: {recipe}")
+        logging.debug("Starting process_recipe with input: %s", recipe)
+        recipe = decorate_recipe(build_recipe_core(recipe))
+        logging.debug("Processed recipe successfully: %s", recipe)
         return recipe
     except Exception as e:
-        logging.error(f"Error processing recipe: {str(e)}", exc_info=True)
-        return {"title": "Error Recipe", "ingredients": [], "steps": ["Something went wrong!"], "nutrition": {"calories": 0}}
+        logging.error("Error processing recipe: %s", e, exc_info=True)
+        return dict(ERROR_RECIPE)
 
 # Temporary mock fallback for generate_random_recipe
-def generate_random_recipe(language='english'):
+def generate_random_recipe(language='english', rng=random):
     logging.debug("Using fallback generate_random_recipe")
     try:
         # Mock a simple random recipe
-        ingredients = random.sample(
-            [item['name'] for cat in INGREDIENT_CATEGORIES.values() for item in cat],
-            k=3
-        )
+        ingredients = rng.sample(ALL_INGREDIENT_NAMES, k=3)
         recipe = {
             'title_en': 'Random Chaos Dish',
             'ingredients': ingredients,
             'steps': [
                 f"Prep: Chop {ingredients[0]} and {ingredients[1]}.",
-                f"Cook: {random.choice(COOKING_METHODS)} everything together.",
+                f"Cook: {rng.choice(COOKING_METHODS)} everything together.",
                 "Serve: Enjoy with a side of chaos!"
             ],
             'nutrition': {'calories': 500}
         }
-        logging.debug(f"Fallback recipe generated: {recipe}")
+        logging.debug("Fallback recipe generated: %s", recipe)
         return recipe
     except Exception as e:
-        logging.error(f"Fallback generate_random_recipe failed: {str(e)}")
+        logging.error("Fallback generate_random_recipe failed: %s", e)
         return None
 
 INGREDIENT_CATEGORIES = {
@@ -350,13 +386,55 @@ INGREDIENT_CATEGORIES = {
     ], key=lambda x: x["name"])
 }
 
+# Measurement and prep text per category for recipe ingredient lists
+INGREDIENT_MEASUREMENTS = {
+    "meat": ("1 lb", "cubed"),
+    "vegetables": ("2 medium", "diced"),
+    "fruits": ("1 cup", "sliced"),
+    "seafood": ("1 lb", "cleaned"),
+    "dairy": ("2 tbsp", "melted"),
+    "bread_carbs": ("1 cup", "cooked"),
+    "devil_water": ("1/2 cup", "")
+}
+
+# Nutrition contributed by one ingredient of each category
+CATEGORY_NUTRITION = {
+    "meat": {"calories": 800, "protein": 60, "fat": 40},
+    "seafood": {"calories": 800, "protein": 60, "fat": 40},
+    "vegetables": {"calories": 100, "carbs": 20},
+    "bread_carbs": {"calories": 200, "carbs": 40},
+    "dairy": {"calories": 150, "fat": 10},
+    "fruits": {"calories": 80, "carbs": 15},
+    "devil_water": {"calories": 100}
+}
+
+IngredientInfo = namedtuple('IngredientInfo', ['category', 'measurement', 'prep', 'nutrition'])
+
+def build_ingredient_lookup(categories):
+    """Map each ingredient name to its IngredientInfo; the first category listing a name wins."""
+    lookup = {}
+    for cat, items in categories.items():
+        measurement, prep = INGREDIENT_MEASUREMENTS.get(cat, ("1 unit", ""))
+        nutrition = MappingProxyType(CATEGORY_NUTRITION.get(cat, {}))
+        for item in items:
+            lookup.setdefault(item['name'], IngredientInfo(cat, measurement, prep, nutrition))
+    return MappingProxyType(lookup)
+
+INGREDIENT_LOOKUP = build_ingredient_lookup(INGREDIENT_CATEGORIES)
+ALL_INGREDIENT_NAMES = tuple(INGREDIENT_LOOKUP)
+INGREDIENTS_RESPONSE = PrecomputedJSON({k: [item['name'] for item in v] for k, v in INGREDIENT_CATEGORIES.items()})
+
 @app.route('/api', methods=['GET'])
 def api_info():
     return jsonify({
         "message": "Welcome to the Chuckle & Chow Recipe API—Where Food Meets Funny!",
         "endpoints": {
             "/ingredients": "GET - Grab some grub options",
-            "/generate_recipe": "POST - Cook up a laugh riot (send ingredients and preferences)"
+            "/generate_recipe": "POST - Cook up a laugh riot (send ingredients and preferences; add a seed for a reproducible recipe, a count for several, ?stream=1 for NDJSON). GET takes ?ingredients=a,b&seed=1",
+            "/generate_recipes": "POST - A whole batch of laughs at once (send {\"requests\": [...]} of generate_recipe payloads)",
+            "/search": "GET - Hunt down recipes by title, steps or ingredients (?q=ginger tofu&page=1&per_page=10&language=spanish)",
+            "/rate": "POST - Hand out some stars (send {\"recipe_id\": 1, \"rating\": 5} or {\"ratings\": [...]})",
+            "/recipes/<id>/similar": "GET - More grub like this one (?limit=5&language=spanish)"
         },
         "status": "cookin’ and jokin’"
     })
@@ -366,132 +444,389 @@ def api_info():
 def get_ingredients():
     if request.method == 'OPTIONS':
         return '', 200
-    return jsonify({k: [item['name'] for item in v] for k, v in INGREDIENT_CATEGORIES.items()})
+    return INGREDIENTS_RESPONSE.response()
 
-def get_cache_key():
-    data = request.get_json(silent=True) or {}
-    is_random = data.get('preferences', {}).get('isRandom', False)
-    ingredients = sorted(data.get('ingredients', []))
-    return f"recipe_{is_random}_{ingredients}"
+def select_recipe_cores(ingredients, preferences, rng=random, engine=None, limit=1):
+    """Pick the base recipes for a request and reduce them to deterministic cores.
 
-@app.route('/generate_recipe', methods=['POST', 'OPTIONS'])
+    Returns (branch, cores, cacheable). The random branch returns at least its
+    top five candidates so the per-request decoration pass can still pick
+    among them; the predefined branch returns up to limit ranked matches.
+    """
+    def core_for(recipe):
+        try:
+            with stage('build_core'):
+                return build_recipe_core({**recipe, 'input_ingredients': ingredients})
+        except Exception as e:
+            logging.error("Error building recipe core: %s", e, exc_info=True)
+            return None
+
+    if preferences.get('isRandom', False):
+        logging.debug("Generating random recipe")
+        candidates = engine.recipes if engine else get_random_candidates()
+        logging.debug("Random selection over %s valid recipes", len(candidates))
+        if not candidates:
+            logging.warning("No valid recipes in recipe catalog; using generate_random_recipe")
+            recipe = generate_random_recipe('english', rng)
+            logging.debug("Generated random recipe: %s", recipe)
+            if not recipe or not isinstance(recipe, dict):
+                logging.error("Invalid recipe generated: %s", recipe)
+                return 'random', [], False
+            return 'random', [core_for(recipe)], False
+        if not ingredients:
+            # Every score would be 0, so skip scoring and draw straight from the weighted sampler.
+            # Draws are random per request and must not be cached.
+            with stage('sample'):
+                picked = get_random_sampler().sample_distinct(rng, limit)
+            return 'random', [core_for(recipe) for recipe in picked], False
+        with stage('score'):
+            if engine:
+                ranked, exact = engine.top(ingredients, max(5, limit)), True
+            else:
+                ranked, exact = rank_random_candidates(ingredients, max(5, limit), rng)
+        cores = [core_for(recipe) for recipe in ranked]
+        # A stand-in sample must not be cached as the answer for this request
+        return 'random', cores, exact and None not in cores
+
+    if ingredients:
+        logging.debug("Matching predefined recipe")
+        if limit > 1:
+            with stage('match'):
+                matches = match_predefined_recipes(ingredients, 'english', limit)
+            logging.debug("Match predefined recipes result: %s matches", len(matches))
+            if matches:
+                cores = [core_for(recipe) for recipe in matches]
+                return 'predefined', cores, None not in cores
+        else:
+            with stage('match'):
+                recipe = match_predefined_recipe(ingredients, 'english')
+            logging.debug("Match predefined recipe result: %s", recipe)
+            if recipe:
+                core = core_for(recipe)
+                return 'predefined', [core], core is not None
+
+    logging.debug("Generating dynamic recipe")
+    with stage('dynamic'):
+        recipe = generate_dynamic_recipe(ingredients, preferences)
+    logging.debug("Dynamic recipe result: %s", recipe)
+    core = core_for(recipe)
+    return 'dynamic', [core], core is not None
+
+def get_recipe_cores(recipe_request, rng=random, engine=None):
+    """select_recipe_cores, served from the recipe cache when the canonical request was seen before."""
+    with stage('cache_lookup'):
+        cached = get_cached_recipe(recipe_request.key)
+    if cached is not None:
+        return cached['branch'], cached['cores'], True
+    branch, cores, cacheable = select_recipe_cores(recipe_request.ingredients, recipe_request.preferences, rng, engine, recipe_request.count)
+    if cacheable:
+        with stage('cache_store'):
+            cache_recipe(recipe_request.key, {'branch': branch, 'cores': cores}, timeout=3600)
+    return branch, cores, False
+
+def pick_rated(cores, rng=random):
+    """Random pick among candidate cores, favouring better rated recipes.
+
+    Ratings come from the live catalog plus this process's unflushed
+    ratings, not from the cores, which may have sat in the cache for an
+    hour. When every candidate weighs the same (e.g. none rated yet) this
+    is a plain rng.choice, so unrated catalogs pick exactly as they always have.
+    """
+    ratings = catalog.snapshot().ratings
+
+    def weight(core):
+        if not core:
+            return 0.0
+        rating, rating_count = ratings.get(core.get('id'), (core.get('rating'), core.get('rating_count')))
+        return rating_weight(*live_rating(core.get('id'), rating, rating_count))
+
+    weights = [weight(core) for core in cores]
+    if len(set(weights)) <= 1:
+        return rng.choice(cores)
+    return rng.choices(cores, weights=weights)[0]
+
+def plan_recipes(recipe_request, engine=None):
+    """Resolve the cores for a request and choose the ones to decorate.
+
+    A count of 1 keeps the classic random pick among the candidates; larger
+    counts take the best count candidates in rank order.
+    Returns (rng, branch, picks, cache_hit).
+    """
+    logging.debug("Canonical inputs: ingredients=%s, preferences=%s, key=%s", recipe_request.ingredients, recipe_request.preferences, recipe_request.key)
+    # A seed routes every random choice through one generator, making the response reproducible
+    rng = random.Random(recipe_request.seed) if recipe_request.seed is not None else random
+    branch, cores, cache_hit = get_recipe_cores(recipe_request, rng, engine)
+    label_request(branch=branch, cache='hit' if cache_hit else 'miss')
+    logging.debug("Recipe cores: branch=%s, candidates=%s, cache_hit=%s", branch, len(cores), cache_hit)
+    if recipe_request.count == 1:
+        picks = [pick_rated(cores, rng)] if cores else []
+    else:
+        picks = cores[:recipe_request.count]
+    return rng, branch, picks, cache_hit
+
+def iter_decorated_recipes(recipe_request, rng, branch, picks):
+    """Generator half of the pipeline: decorate and enrich each picked core as it is needed."""
+    style = recipe_request.preferences.get('style', '')
+    category = recipe_request.preferences.get('category', '')
+    for core in picks:
+        try:
+            with stage('decorate'):
+                processed_recipe = decorate_recipe(core, rng) if core else dict(ERROR_RECIPE)
+        except Exception as e:
+            logging.error("Error decorating recipe: %s", e, exc_info=True)
+            processed_recipe = dict(ERROR_RECIPE)
+        if style:
+            processed_recipe['title'] = f"{processed_recipe['title']} ({style})"
+        if category:
+            processed_recipe['title'] = f"{processed_recipe['title']} - {category}"
+        logging.info("Generated %s recipe: %s", branch, processed_recipe.get('title', 'Unknown Recipe'))
+        yield processed_recipe
+
+def generate_for_request(recipe_request, engine=None):
+    """Run one canonical request through the whole pipeline; returns (recipes, cache_hit)."""
+    rng, branch, picks, cache_hit = plan_recipes(recipe_request, engine)
+    return list(iter_decorated_recipes(recipe_request, rng, branch, picks)), cache_hit
+
+@app.route('/generate_recipe', methods=['GET', 'POST', 'OPTIONS'])
 @limiter.limit("20 per minute")
-@cache.cached(timeout=3600, key_prefix=get_cache_key)
+@profiled
 def generate_recipe():
     if request.method == 'OPTIONS':
         return '', 200
+    start_timing()
     try:
-        raw_data = request.get_data(as_text=True)
-        logging.debug(f"Raw request data: {raw_data}")
-        
-        data = request.get_json(silent=True)
-        if data is None:
-            logging.error("Failed to parse JSON: invalid or missing payload")
-            return jsonify({"error": "Invalid or missing JSON payload—check your request format!"}), 400
-        if not isinstance(data, dict):
-            logging.error(f"Parsed data is not a dict: {data}")
-            return jsonify({"error": "Payload must be a JSON object—not an array or string!"}), 400
-        
-        ingredients = data.get('ingredients', [])
-        preferences = data.get('preferences', {})
-        logging.debug(f"Extracted inputs: ingredients={ingredients}, preferences={preferences}")
-        if not isinstance(ingredients, list):
-            return jsonify({"error": "Ingredients must be a list"}), 400
-        if not isinstance(preferences, dict):
-            return jsonify({"error": "Preferences must be a dict"}), 400
-        
-        is_random = preferences.get('isRandom', False)
-        style = preferences.get('style', '')
-        category = preferences.get('category', '')
-        logging.debug(f"Processing with: is_random={is_random}, style={style}, category={category}")
-
-        def process_and_enrich_recipe(recipe):
-            logging.debug(f"Processing recipe: {recipe}")
-            processed = process_recipe({**recipe, 'input_ingredients': ingredients})
-            if not processed or not isinstance(processed, dict):
-                logging.warning("process_recipe returned invalid data; using fallback")
-                processed = {"title": "Fallback Recipe", "ingredients": [], "steps": ["Try again later!"], "nutrition": {"calories": 0}}
-            if style:
-                processed['title'] = f"{processed['title']} ({style})"
-            if category:
-                processed['title'] = f"{processed['title']} - {category}"
-            return processed
-
-        if is_random:
-            logging.debug("Generating random recipe")
-            logging.debug(f"ALL_RECIPES length: {len(ALL_RECIPES)}, sample: {ALL_RECIPES[:2] if ALL_RECIPES else []}")
-            if not ALL_RECIPES:
-                logging.warning("ALL_RECIPES is empty; falling back to generate_random_recipe")
-                recipe = generate_random_recipe('english')
-                logging.debug(f"Generated random recipe: {recipe}")
-            else:
-                valid_recipes = [r for r in ALL_RECIPES if isinstance(r, dict) and 'ingredients' in r and 'title_en' in r]
-                logging.debug(f"Found {len(valid_recipes)} valid recipes out of {len(ALL_RECIPES)}")
-                if not valid_recipes:
-                    logging.warning("No valid recipes in ALL_RECIPES; using generate_random_recipe")
-                    recipe = generate_random_recipe('english')
-                    logging.debug(f"Generated random recipe: {recipe}")
-                else:
-                    scored_recipes = [(r, score_recipe(r, ingredients, preferences)) for r in valid_recipes]
-                    top_recipes = sorted(scored_recipes, key=lambda x: x[1], reverse=True)[:5]
-                    recipe = random.choice([r for r, _ in top_recipes])
-                    logging.debug(f"Selected random recipe from ALL_RECIPES: {recipe}")
-            if not recipe or not isinstance(recipe, dict):
-                logging.error(f"Invalid recipe generated: {recipe}")
+        with stage('parse'):
+            recipe_request = get_recipe_request()
+        if wants_ndjson():
+            rng, branch, picks, cache_hit = plan_recipes(recipe_request)
+            if not picks:
                 return jsonify({"error": "Failed to generate a valid random recipe"}), 500
-            processed_recipe = process_and_enrich_recipe(recipe)
-            logging.info(f"Generated random recipe: {processed_recipe.get('title', 'Unknown Recipe')}")
-            return jsonify(processed_recipe)
-
-        if ingredients:
-            logging.debug("Matching predefined recipe")
-            recipe = match_predefined_recipe(ingredients, 'english')
-            logging.debug(f"Match predefined recipe result: {recipe}")
-            if recipe:
-                processed_recipe = process_and_enrich_recipe(recipe)
-                logging.info(f"Matched predefined recipe: {processed_recipe.get('title', 'Unknown Recipe')}")
-                return jsonify(processed_recipe)
+            # stream_with_context holds the request open until the last line, so the
+            # decorate stages below still land in this request's timings
+            response = ndjson_response(iter_decorated_recipes(recipe_request, rng, branch, picks))
+            response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+            return response
+        recipes, cache_hit = generate_for_request(recipe_request)
+        if not recipes:
+            return jsonify({"error": "Failed to generate a valid random recipe"}), 500
+        with stage('serialize'):
+            response = jsonify(recipes[0] if recipe_request.count == 1 else {"recipes": recipes})
+            response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+            if recipe_request.seed is not None:
+                response = add_strong_etag(response)
+        return response
 
-        logging.debug("Generating dynamic recipe")
-        recipe = generate_dynamic_recipe(ingredients, preferences)
-        logging.debug(f"Dynamic recipe result: {recipe}")
-        processed_recipe = process_and_enrich_recipe(recipe)
-        if not processed_recipe:
-            logging.error(f"Failed to generate dynamic recipe: {recipe}", exc_info=True)
-            return jsonify({"error": "Recipe generation flopped—blame the chef!"}), 500
-        logging.info(f"Generated dynamic recipe: {processed_recipe.get('title', 'Unknown Recipe')}")
-        return jsonify(processed_recipe)
+    except RecipeRequestError as e:
+        logging.warning("Rejected recipe request: %s", e)
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error("Unexpected error in generate_recipe: %s", e, exc_info=True)
+        return jsonify({"error": f"Unexpected error: {str(e)}—check the logs!"}), 500
+
+def iter_batch_lines(items, engine):
+    """NDJSON lines for a batch: {"index", "recipe"} per generated recipe, or {"index", "error"}."""
+    for index, item in enumerate(items):
+        if isinstance(item, RecipeRequestError):
+            yield {"index": index, "error": str(item)}
+            continue
+        rng, branch, picks, _ = plan_recipes(item, engine)
+        if not picks:
+            yield {"index": index, "error": "Failed to generate a valid random recipe"}
+        for recipe in iter_decorated_recipes(item, rng, branch, picks):
+            yield {"index": index, "recipe": recipe}
+
+def batch_scoring_engine(items):
+    """One scoring engine (with its per-input ratio cache) shared by a batch's isRandom items.
+
+    None when no item is random or scoring is offloaded to the pool.
+    """
+    if scoring_pool is not None:
+        return None
+    if not any(not isinstance(item, RecipeRequestError) and item.preferences.get('isRandom') for item in items):
+        return None
+    return get_scoring_engine()
+
+@app.route('/generate_recipes', methods=['POST', 'OPTIONS'])
+@limiter.limit("10 per minute")
+def generate_recipes():
+    if request.method == 'OPTIONS':
+        return '', 200
+    try:
+        items = canonicalize_batch(request.get_json(silent=True))
+        engine = batch_scoring_engine(items)
+        if wants_ndjson():
+            return ndjson_response(iter_batch_lines(items, engine))
+        results = []
+        for item in items:
+            if isinstance(item, RecipeRequestError):
+                results.append({"error": str(item)})
+                continue
+            recipes, _ = generate_for_request(item, engine)
+            if not recipes:
+                results.append({"error": "Failed to generate a valid random recipe"})
+            else:
+                results.append(recipes[0] if item.count == 1 else {"recipes": recipes})
+        logging.info("Generated batch of %s recipes", len(results))
+        return jsonify({"recipes": results})
 
+    except RecipeRequestError as e:
+        logging.warning("Rejected batch request: %s", e)
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        logging.error(f"Unexpected error in generate_recipe: {str(e)}", exc_info=True)
+        logging.error("Unexpected error in generate_recipes: %s", e, exc_info=True)
         return jsonify({"error": f"Unexpected error: {str(e)}—check the logs!"}), 500
 
+@app.route('/search', methods=['GET', 'OPTIONS'])
+@limiter.limit("30 per minute")
+def search():
+    if request.method == 'OPTIONS':
+        return '', 200
+    query = request.args.get('q', '').strip()
+    page = request.args.get('page', '1')
+    per_page = request.args.get('per_page', '10')
+    if not query:
+        return jsonify({"error": "Give us something to hunt for—add ?q=your search"}), 400
+    if not page.isdigit() or int(page) < 1 or not per_page.isdigit() or not 1 <= int(per_page) <= SEARCH_MAX_PER_PAGE:
+        return jsonify({"error": f"page must be 1 or more and per_page between 1 and {SEARCH_MAX_PER_PAGE}"}), 400
+    page, per_page = int(page), int(per_page)
+    spanish = request.args.get('language', 'english').strip().lower() == 'spanish'
+    try:
+        total, recipes = search_recipes(query, limit=per_page, offset=(page - 1) * per_page)
+    except Exception as e:
+        logging.error("Search failed for %r: %s", query, e, exc_info=True)
+        return jsonify({"error": f"Search fell in the creek: {str(e)}"}), 500
+    results = [{
+        "id": recipe['id'],
+        "title": recipe['title_es'] if spanish else recipe['title_en'],
+        "ingredients": recipe['ingredients'],
+        "cooking_time": recipe['cooking_time'],
+        "difficulty": recipe['difficulty'],
+        "rating": recipe['rating'],
+        "score": recipe['score']
+    } for recipe in recipes]
+    return jsonify({
+        "query": query,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": (total + per_page - 1) // per_page,
+        "results": results
+    })
+
+@app.route('/recipes/<int:recipe_id>/similar', methods=['GET'])
+def similar_recipes(recipe_id):
+    recipe = catalog.get_recipe(recipe_id)
+    if recipe is None:
+        return jsonify({"error": f"No such recipe: {recipe_id}"}), 404
+    limit = request.args.get('limit', str(SIMILAR_K))
+    if not limit.isdigit() or not 1 <= int(limit) <= SIMILAR_K:
+        return jsonify({"error": f"limit must be between 1 and {SIMILAR_K}"}), 400
+    spanish = request.args.get('language', 'english').strip().lower() == 'spanish'
+    similar = []
+    for similar_id, score in get_similar(recipe_id, int(limit)):
+        neighbor = catalog.get_recipe(similar_id)
+        # Neighbors are precomputed; skip any deleted since the last rebuild
+        if neighbor is None:
+            continue
+        similar.append({
+            "id": similar_id,
+            "title": neighbor['title_es'] if spanish else neighbor['title_en'],
+            "ingredients": neighbor['ingredients'],
+            "score": score
+        })
+    return jsonify({"recipe_id": recipe_id, "similar": similar})
+
+@app.route('/rate', methods=['POST', 'OPTIONS'])
+@limiter.limit("60 per minute")
+def rate():
+    if request.method == 'OPTIONS':
+        return '', 200
+    try:
+        ratings = canonicalize_ratings(request.get_json(silent=True))
+    except RecipeRequestError as e:
+        logging.warning("Rejected rating request: %s", e)
+        return jsonify({"error": str(e)}), 400
+    unknown = sorted({recipe_id for recipe_id, _ in ratings if catalog.get_recipe(recipe_id) is None})
+    if unknown:
+        return jsonify({"error": f"No such recipe: {', '.join(map(str, unknown))}"}), 404
+    for recipe_id, stars in ratings:
+        record_rating(recipe_id, stars)
+    # Ratings are buffered and written behind; they show up in the catalog after the next flush
+    return jsonify({"accepted": len(ratings)}), 202
+
+@app.route('/ratings/stats', methods=['GET'])
+def get_rating_stats():
+    return jsonify(rating_stats())
+
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(cache_stats())
+
+@app.route('/db/stats', methods=['GET'])
+def get_db_stats():
+    return jsonify(pool_stats())
+
+@app.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    if not is_admin():
+        return jsonify({"error": "Admin token required"}), 403
+    return jsonify(profile_stats())
+
+@app.route('/admin/profiles/<int:profile_id>', methods=['GET'])
+def show_profile(profile_id):
+    if not is_admin():
+        return jsonify({"error": "Admin token required"}), 403
+    profile = get_profile(profile_id)
+    if profile is None:
+        return jsonify({"error": f"No profile {profile_id} in this worker's buffer"}), 404
+    return jsonify(profile)
+
+@app.route('/admin/profiles/sampling', methods=['PUT'])
+def set_profile_sampling():
+    if not is_admin():
+        return jsonify({"error": "Admin token required"}), 403
+    data = request.get_json(silent=True)
+    try:
+        set_sample_every(data.get('sample_every') if isinstance(data, dict) else None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(profile_stats())
+
+@app.route('/metrics', methods=['GET'])
+@limiter.exempt
+def get_metrics():
+    return Response(prometheus_text(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.route('/metrics/stats', methods=['GET'])
+def get_metrics_stats():
+    return jsonify({"stages": stage_stats()})
+
 # Serve React frontend for non-API routes
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_frontend(path):
-    logging.debug(f"Current working directory: {os.getcwd()}")
-    logging.debug(f"Checking build directory: build")
+    logging.debug("Current working directory: %s", os.getcwd())
+    logging.debug("Checking build directory: build")
     build_dir = 'build'
-    logging.debug(f"Attempting to serve frontend for path: {path or 'index.html'}")
+    logging.debug("Attempting to serve frontend for path: %s", path or 'index.html')
     if path and (path.startswith('generate_recipe') or path.startswith('ingredients') or path.startswith('api')):
-        logging.debug(f"Routing to API: {path}")
+        logging.debug("Routing to API: %s", path)
         return app.send_static_file(path)  # Let Flask handle API routes
     try:
         if not os.path.exists(build_dir):
-            logging.error(f"Build directory not found: {build_dir}")
+            logging.error("Build directory not found: %s", build_dir)
             return jsonify({"error": "Frontend build not found. Please check build process."}), 500
         file_path = path or 'index.html'
-        logging.debug(f"Serving file: {os.path.join(build_dir, file_path)}")
+        logging.debug("Serving file: %s", os.path.join(build_dir, file_path))
         return send_from_directory(build_dir, file_path)
     except FileNotFoundError as e:
-        logging.error(f"File not found: {os.path.join(build_dir, file_path)} - {str(e)}")
+        logging.error("File not found: %s - %s", os.path.join(build_dir, file_path), e)
         if file_path != 'index.html':
             logging.debug("Falling back to index.html for SPA routing")
             return send_from_directory(build_dir, 'index.html')
         return jsonify({"error": f"Frontend index.html not found in {build_dir}. Please check build process."}), 500
     except Exception as e:
-        logging.error(f"Error serving frontend: {str(e)}", exc_info=True)
+        logging.error("Error serving frontend: %s", e, exc_info=True)
         return jsonify({"error": f"Failed to serve frontend: {str(e)}"}), 500
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+"""ASGI entry point for the recipe API.
+
+Serve with:  uvicorn asgi:application --port 5000
+        or:  gunicorn asgi:application -k uvicorn.workers.UvicornWorker
+
+The event loop owns the sockets: request bodies are read and responses
+written asynchronously, so slow mobile clients never tie up a thread.
+Only the Flask handler itself (SQLite reads, scoring, recipe processing)
+runs on app.executor, a bounded thread pool sized by WORKER_THREADS.
+
+Response chunks pass from the handler thread to the event loop through a
+queue of BRIDGE_QUEUE_SIZE messages. A handler that produces faster than
+the client reads blocks until the client catches up, and a client that
+disconnects stops the handler's output generator.
+"""
+import asyncio
+import concurrent.futures
+import io
+import logging
+import os
+import sys
+import threading
+
+from app import app, executor
+from ratings import flush_ratings
+
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", str(1024 * 1024)))
+BRIDGE_QUEUE_SIZE = int(os.getenv("BRIDGE_QUEUE_SIZE", "16"))
+# How often a handler blocked on a full queue checks whether the client went away
+DISCONNECT_POLL = 0.5
+
+_DONE = object()
+
+
+class ClientDisconnected(Exception):
+    """The client went away; raised in the handler thread to stop producing output."""
+
+
+class WSGIBridge:
+    """Adapt a WSGI app to ASGI, running each request on a bounded executor."""
+
+    def __init__(self, wsgi_app, pool, max_body_bytes=MAX_BODY_BYTES):
+        self.wsgi_app = wsgi_app
+        self.pool = pool
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            more_body = message.get("more_body", False)
+            if len(body) > self.max_body_bytes:
+                await _send_plain(send, 413, b"Request body too large")
+                return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=BRIDGE_QUEUE_SIZE)
+        disconnected = threading.Event()
+
+        def put(item):
+            # Blocks the handler thread while the queue is full, i.e. while the client is slower than the handler
+            if disconnected.is_set():
+                raise ClientDisconnected()
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    return future.result(timeout=DISCONNECT_POLL)
+                except concurrent.futures.TimeoutError:
+                    if disconnected.is_set():
+                        future.cancel()
+                        raise ClientDisconnected()
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        environ = build_environ(scope, bytes(body))
+        loop.run_in_executor(self.pool, self._run, environ, put)
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    return
+                item = getter.result()
+                if item is _DONE:
+                    break
+                await send(item)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            watcher.cancel()
+            disconnected.set()
+
+    def _run(self, environ, put):
+        """Call the WSGI app and forward its output as ASGI messages; runs on the pool."""
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started[:] = [(status, headers)]
+
+        def send_start():
+            status, headers = started[0]
+            put({
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+            })
+
+        result = None
+        header_sent = False
+        try:
+            result = self.wsgi_app(environ, start_response)
+            for chunk in result:
+                if not chunk:
+                    continue
+                if not header_sent:
+                    send_start()
+                    header_sent = True
+                put({"type": "http.response.body", "body": chunk, "more_body": True})
+            if not header_sent:
+                send_start()
+                header_sent = True
+        except ClientDisconnected:
+            logging.info("Client disconnected; stopped %s %s", environ.get("REQUEST_METHOD"), environ.get("PATH_INFO"))
+            return
+        except Exception as e:
+            logging.error("Unhandled error in ASGI bridge: %s", e, exc_info=True)
+            if not header_sent:
+                put({
+                    "type": "http.response.start",
+                    "status": 500,
+                    "headers": [(b"content-type", b"text/plain; charset=utf-8")]
+                })
+                put({"type": "http.response.body", "body": b"Internal Server Error", "more_body": True})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        try:
+            put(_DONE)
+        except ClientDisconnected:
+            pass
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Write buffered ratings before the worker goes away
+                await asyncio.get_running_loop().run_in_executor(self.pool, flush_ratings)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI HTTP scope."""
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("127.0.0.1", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _send_plain(send, status, body):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+    await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+application = WSGIBridge(app, executor)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("asgi:application", host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
@@ -0,0 +1,247 @@
+"""Benchmark the recipe pipeline on synthetic catalogs and compare against a saved baseline.
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py                      # 100, 1k, 10k and 100k recipes
+    python benchmarks/bench_pipeline.py --sizes 100,1000 --seconds 0.5
+    python benchmarks/bench_pipeline.py --save               # make this run the new baseline
+
+Every catalog is generated deterministically from INGREDIENT_CATEGORIES and
+FLAVOR_PAIRS, imported into its own database in a temporary directory and
+loaded as the live recipe catalog. Each case reports ops/sec, p50/p95/p99
+latency and the peak memory allocated by its calls (from a separate, short
+tracemalloc run, so tracing does not slow the timed run). When the baseline
+file exists, cases whose ops/sec dropped or whose p95 grew by more than
+--threshold are flagged and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "pipeline_baseline.json")
+# Importing app initializes recipes.db in the working directory; keep that out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="bench_pipeline_"))
+# No background similarity rebuilds competing with the timed calls
+os.environ["SIMILARITY_REFRESH_INTERVAL"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import logging  # noqa: E402
+
+import app  # noqa: E402
+import database  # noqa: E402
+from recipe_catalog import get_catalog  # noqa: E402
+from recipe_generator import match_predefined_recipe, generate_dynamic_recipe  # noqa: E402
+from recipe_import import import_recipes  # noqa: E402
+from services.caching_service import clear_cache  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+SIZES = [100, 1000, 10000, 100000]
+MIN_CALLS = 5
+MAX_CALLS = 100000
+MEMORY_CALLS = 3
+INPUTS = 2000
+METHODS = ["Fry", "Bake", "Grill", "Stew", "Roast", "Smoke"]
+
+
+def vocabulary():
+    names = {item['name'] for items in app.INGREDIENT_CATEGORIES.values() for item in items}
+    for ing, partners in database.FLAVOR_PAIRS.items():
+        names.add(ing)
+        names.update(partners)
+    return sorted(names)
+
+
+def synthetic_recipes(size, seed=42):
+    """size recipes built around an anchor ingredient, its flavor partners and a few random extras."""
+    rng = random.Random(seed)
+    words = vocabulary()
+    recipes = []
+    for i in range(size):
+        anchor = rng.choice(words)
+        partners = database.FLAVOR_PAIRS.get(anchor, [])
+        ingredients = [anchor] + rng.sample(partners, min(len(partners), rng.randint(1, 3)))
+        ingredients += rng.sample(words, rng.randint(1, 5))
+        ingredients = list(dict.fromkeys(ingredients))
+        method = rng.choice(METHODS)
+        steps = [f"Prep the {ing}." for ing in ingredients[:3]] + [f"{method} everything for {rng.randint(10, 60)} minutes.", "Serve hot."]
+        recipes.append({
+            "title_en": f"{method}ed {anchor.title()} No. {i}",
+            "title_es": f"{anchor.title()} No. {i}",
+            "steps_en": steps,
+            "steps_es": steps,
+            "ingredients": ingredients,
+            "nutrition": {"calories": rng.randint(150, 900), "protein": rng.randint(2, 60), "fat": rng.randint(1, 50)},
+            "cooking_time": rng.choice([10, 15, 20, 30, 45, 60]),
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "rating": round(rng.uniform(1, 5), 1) if rng.random() < 0.3 else 0.0,
+            "rating_count": rng.randint(1, 200) if rng.random() < 0.3 else 0
+        })
+    return recipes
+
+
+def load_catalog(size, seed):
+    """Point the app at a fresh database holding only the synthetic recipes; returns the catalog recipes."""
+    database.DATABASE_FILE = f"catalog_{size}.db"
+    database.init_db()
+    with database.get_db_connection() as conn:
+        # init_db seeds the built-in recipes into an empty table; the benchmark wants only its own
+        conn.execute("DELETE FROM recipes")
+    import_recipes(synthetic_recipes(size, seed))
+    catalog = get_catalog()
+    catalog._watch_conn = None
+    catalog.refresh(force=True)
+    clear_cache()
+    return catalog.get_recipes()
+
+
+def make_inputs(recipes, seed):
+    """Per-call inputs: catalog recipes, ingredient subsets of them (predefined hits) and unknown ingredients."""
+    rng = random.Random(seed)
+    words = vocabulary()
+    picked = [rng.choice(recipes) for _ in range(INPUTS)]
+    return {
+        "recipes": picked,
+        "matching": [rng.sample(recipe['ingredients'], min(2, len(recipe['ingredients']))) for recipe in picked],
+        "random": [rng.sample(words, 2) for _ in range(INPUTS)],
+        "unknown": [[f"mystery {rng.randrange(10 ** 9)}", rng.choice(words)] for _ in range(INPUTS)]
+    }
+
+
+def cases(inputs, client):
+    """(name, op) pairs; op(i) performs call number i."""
+    recipes, matching, unknown = inputs["recipes"], inputs["matching"], inputs["unknown"]
+
+    def post(payload):
+        response = client.post('/generate_recipe', json=payload)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    def pick(items, i):
+        return items[i % len(items)]
+
+    return [
+        ("score_recipe", lambda i: app.score_recipe(pick(recipes, i), pick(inputs["random"], i), {})),
+        ("process_recipe", lambda i: app.process_recipe(dict(pick(recipes, i)))),
+        ("match_predefined_recipe", lambda i: match_predefined_recipe(pick(matching, i), 'english')),
+        ("generate_dynamic_recipe", lambda i: generate_dynamic_recipe(pick(unknown, i), {})),
+        ("get_all_recipes", lambda i: database.get_all_recipes()),
+        ("handler_predefined", lambda i: post({"ingredients": pick(matching, i)})),
+        ("handler_random", lambda i: post({"ingredients": pick(inputs["random"], i), "preferences": {"isRandom": True}})),
+        ("handler_dynamic", lambda i: post({"ingredients": pick(unknown, i)})),
+        ("handler_cached", lambda i: post({"ingredients": matching[0]}))
+    ]
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure(op, seconds, seed):
+    random.seed(seed)
+    op(0)  # warm up lazily built indexes and engines
+    latencies = []
+    started = time.perf_counter()
+    deadline = started + seconds
+    i = 1
+    while i <= MAX_CALLS and (i <= MIN_CALLS or time.perf_counter() < deadline):
+        call_started = time.perf_counter()
+        op(i)
+        latencies.append(time.perf_counter() - call_started)
+        i += 1
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        for j in range(MEMORY_CALLS):
+            op(i + j)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+def compare(results, baseline, threshold):
+    """Cases whose ops/sec fell, or whose p95 rose, by more than threshold relative to the baseline."""
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        if result["ops_per_sec"] < old["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{key}: {old['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/sec")
+        if result["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append(f"{key}: p95 {old['p95_ms']:.3f} -> {result['p95_ms']:.3f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recipe pipeline on synthetic catalogs.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="comma-separated catalog sizes")
+    parser.add_argument('--seconds', type=float, default=1.0, help="time budget per case")
+    parser.add_argument('--seed', type=int, default=42, help="seed for catalogs, inputs and the random module")
+    parser.add_argument('--only', default='', help="comma-separated case names to run")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file (default: %(default)s)")
+    parser.add_argument('--save', action='store_true', help="write this run to the baseline file")
+    parser.add_argument('--threshold', type=float, default=0.15, help="relative change flagged as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    only = {name for name in args.only.split(',') if name}
+    app.limiter.enabled = False
+    client = app.app.test_client()
+
+    results = {}
+    print(f"{'recipes':>8} {'case':<24} {'ops/sec':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KB':>9}")
+    for size in sizes:
+        started = time.perf_counter()
+        recipes = load_catalog(size, args.seed)
+        print(f"{size:>8} {'(catalog load)':<24} {time.perf_counter() - started:>10.2f}s")
+        inputs = make_inputs(recipes, args.seed)
+        for name, op in cases(inputs, client):
+            if only and name not in only:
+                continue
+            result = measure(op, args.seconds, args.seed)
+            results[f"{size}/{name}"] = result
+            print(f"{size:>8} {name:<24} {result['ops_per_sec']:>11.1f} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['peak_kb']:>9.1f}")
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        print(f"\nCompared with {args.baseline} ({baseline.get('meta', {}).get('created', 'unknown date')}):")
+        print("\n".join(f"  REGRESSION {line}" for line in regressions) or "  no regressions")
+
+    if args.save:
+        meta = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "seconds": args.seconds
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
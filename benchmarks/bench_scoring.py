@@ -0,0 +1,73 @@
+"""Compare app.score_recipe against scoring.ScoringEngine on synthetic catalogs.
+
+Run from the repository root:  python benchmarks/bench_scoring.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# Importing app initializes recipes.db in the working directory; keep that out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="bench_scoring_"))
+# No background similarity rebuilds or scoring workers competing with the timed loops
+os.environ["SIMILARITY_REFRESH_INTERVAL"] = "0"
+os.environ["SCORING_PROCESSES"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import logging  # noqa: E402
+
+import app  # noqa: E402
+from pairings import INGREDIENT_PAIRS  # noqa: E402
+from scoring import ScoringEngine  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+SIZES = [100, 1000, 10000]
+REQUESTS = 20
+QUERIES = [["chicken", "rice"], ["ground beef", "beer", "onion"], ["salmon"], ["pork", "apple", "whiskey", "potato"]]
+
+
+def synthetic_catalog(size, seed=42):
+    rng = random.Random(seed)
+    base = [item['name'] for items in app.INGREDIENT_CATEGORIES.values() for item in items]
+    vocabulary = base + [f"{style} {name}" for style in ("smoked", "fresh", "spicy", "dried") for name in base]
+    return [
+        {"id": i, "title_en": f"Recipe {i}", "ingredients": rng.sample(vocabulary, rng.randint(2, 8))}
+        for i in range(size)
+    ]
+
+
+def bench(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(QUERIES[i % len(QUERIES)])
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    print(f"{'recipes':>8} {'score_recipe':>14} {'engine (cold)':>14} {'engine (warm)':>14} {'speedup':>8}")
+    for size in SIZES:
+        recipes = synthetic_catalog(size)
+
+        def baseline(ingredients):
+            scored = [(r, app.score_recipe(r, ingredients, {})) for r in recipes]
+            return [r for r, _ in sorted(scored, key=lambda x: x[1], reverse=True)[:5]]
+
+        engine = ScoringEngine(recipes, INGREDIENT_PAIRS)
+        for query in QUERIES:
+            expected = [app.score_recipe(r, query, {}) for r in recipes]
+            assert engine.scores(query).tolist() == expected, f"score mismatch at {size} recipes"
+            assert engine.top(query, 5) == baseline(query), f"top-5 mismatch at {size} recipes"
+
+        repeat = max(1, REQUESTS * 100 // size)
+        old = bench(baseline, repeat)
+        cold = bench(lambda q: ScoringEngine(recipes, INGREDIENT_PAIRS).top(q, 5), repeat)
+        warm = bench(lambda q: engine.top(q, 5), REQUESTS)
+        print(f"{size:>8} {old * 1000:>12.2f}ms {cold * 1000:>12.2f}ms {warm * 1000:>12.3f}ms {old / warm:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
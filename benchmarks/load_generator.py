@@ -0,0 +1,384 @@
+"""Closed-loop HTTP load generator for the recipe API.
+
+Run from the repository root against a running server:
+
+    python benchmarks/load_generator.py --url http://127.0.0.1:5000 --rps 50 --duration 30
+
+or let it start the production server itself, with the startCommand from
+render.yaml (gunicorn + uvicorn workers):
+
+    python benchmarks/load_generator.py --spawn --workers 2 --rps 100 --duration 60
+
+--concurrency virtual users each hold one keep-alive connection and send
+their next request only after the previous one finished (closed loop);
+--rps paces all of them together, so a slow server shows up as achieved
+RPS below the target rather than as an ever-growing backlog. Requests are
+drawn from --mix, e.g. "ingredients=2,predefined=4,random=2,dynamic=1,static=1".
+
+Rate limits apply as configured unless a token is given (--token or
+LOAD_TEST_TOKEN): it is sent as X-Load-Test-Token, and a server started with
+the same LOAD_TEST_TOKEN skips rate limiting for those requests. --spawn
+passes its token (a random one if none was given) to the server; add
+--no-bypass to load it with the limits on. 429s are counted apart from errors.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import re
+import secrets
+import shlex
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from recipes_data import RANDOM_RECIPES  # noqa: E402
+
+DEFAULT_MIX = "ingredients=2,predefined=4,random=2,dynamic=1,static=1"
+REQUEST_TIMEOUT = 30.0
+# Latency histogram upper bounds in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+STATIC_PATHS = ["/", "/index.html", "/favicon.ico"]
+
+
+class HTTPConnection:
+    """One keep-alive HTTP/1.1 connection; reconnects after the server closes it or an error."""
+
+    def __init__(self, host, port, headers):
+        self.host = host
+        self.port = port
+        self.headers = headers
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive", f"Content-Length: {len(body)}"]
+        if payload is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in self.headers.items())
+        try:
+            self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+            await self.writer.drain()
+            return await self._read_response(method)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _read_response(self, method):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if method == 'HEAD' or status in (204, 304):
+            body = b''
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        else:
+            body = await self.reader.read()
+            self.close()
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, body
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def parse_mix(text):
+    """{kind: weight} from "ingredients=2,predefined=4,..."."""
+    mix = {}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        kind, _, weight = item.partition('=')
+        kind = kind.strip()
+        if kind not in REQUEST_BUILDERS:
+            raise ValueError(f"Unknown request kind in --mix: {kind} (use {', '.join(REQUEST_BUILDERS)})")
+        mix[kind] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("--mix needs at least one request kind with a positive weight")
+    return mix
+
+
+_VOCABULARY = sorted({ing for recipe in RANDOM_RECIPES for ing in recipe['ingredients']})
+
+
+def _ingredients(rng):
+    return 'GET', '/ingredients', None
+
+
+def _predefined(rng):
+    # A subset of a built-in recipe's ingredients always matches that recipe
+    ingredients = rng.choice(RANDOM_RECIPES)['ingredients']
+    return 'POST', '/generate_recipe', {"ingredients": rng.sample(ingredients, min(2, len(ingredients)))}
+
+
+def _random(rng):
+    return 'POST', '/generate_recipe', {"ingredients": rng.sample(_VOCABULARY, 2), "preferences": {"isRandom": True}}
+
+
+def _dynamic(rng):
+    # Fresh unknown ingredients miss both the predefined match and the recipe cache
+    return 'POST', '/generate_recipe', {"ingredients": [f"mystery spice {rng.randrange(10 ** 9)}", rng.choice(_VOCABULARY)]}
+
+
+def _static(rng):
+    return 'GET', rng.choice(STATIC_PATHS), None
+
+
+REQUEST_BUILDERS = {
+    'ingredients': _ingredients,
+    'predefined': _predefined,
+    'random': _random,
+    'dynamic': _dynamic,
+    'static': _static
+}
+
+
+class KindStats:
+    """Outcome counts and latencies for one request kind."""
+
+    def __init__(self):
+        self.latencies = []
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.statuses = {}
+        self.errors = 0
+        self.rate_limited = 0
+
+    def record(self, latency_ms, status=None):
+        self.latencies.append(latency_ms)
+        self.histogram[bisect.bisect_left(BUCKETS_MS, latency_ms)] += 1
+        if status is None or status >= 500:
+            self.errors += 1
+        elif status == 429:
+            self.rate_limited += 1
+        key = str(status) if status is not None else 'connection error'
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def percentile(q):
+            return round(latencies[min(count - 1, int(q * count))], 3) if count else 0.0
+
+        return {
+            "requests": count,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "rate_limited": self.rate_limited,
+            "statuses": self.statuses,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(latencies[-1], 3) if count else 0.0,
+            "histogram_ms": {f"<={bound}": n for bound, n in zip(BUCKETS_MS + ('inf',), self.histogram)}
+        }
+
+
+class Pacer:
+    """Hands out evenly spaced send times at rps across all users; rps <= 0 means no pacing."""
+
+    def __init__(self, rps, start):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self.next_slot = start
+
+    async def wait(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        # A closed loop that fell behind does not get to burst to catch up
+        slot = max(self.next_slot, loop.time())
+        self.next_slot = slot + self.interval
+        await asyncio.sleep(max(0.0, slot - loop.time()))
+
+
+async def user(connection, mix, rng, pacer, stats, stop_at, record_from):
+    kinds, weights = list(mix), list(mix.values())
+    loop = asyncio.get_running_loop()
+    while True:
+        await pacer.wait()
+        if loop.time() >= stop_at:
+            return
+        kind = rng.choices(kinds, weights)[0]
+        method, path, payload = REQUEST_BUILDERS[kind](rng)
+        started = loop.time()
+        try:
+            status, _ = await asyncio.wait_for(connection.request(method, path, payload), REQUEST_TIMEOUT)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            connection.close()
+            status = None
+        if started >= record_from:
+            stats.setdefault(kind, KindStats()).record((loop.time() - started) * 1000, status)
+
+
+async def run_load(url, mix, rps, duration, concurrency, warmup, token, seed):
+    parts = urlsplit(url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    headers = {"X-Load-Test-Token": token} if token else {}
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    record_from = start + warmup
+    stop_at = record_from + duration
+    pacer = Pacer(rps, start)
+    stats = {}
+    connections = [HTTPConnection(host, port, headers) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*(
+            user(connection, mix, random.Random(seed + i), pacer, stats, stop_at, record_from)
+            for i, connection in enumerate(connections)
+        ))
+    finally:
+        for connection in connections:
+            connection.close()
+    elapsed = loop.time() - record_from
+    total = KindStats()
+    for kind_stats in stats.values():
+        for latency in kind_stats.latencies:
+            total.histogram[bisect.bisect_left(BUCKETS_MS, latency)] += 1
+        total.latencies.extend(kind_stats.latencies)
+        total.errors += kind_stats.errors
+        total.rate_limited += kind_stats.rate_limited
+        for status, n in kind_stats.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + n
+    return {
+        "target_rps": rps,
+        "concurrency": concurrency,
+        "duration": round(elapsed, 3),
+        "total": total.summary(elapsed),
+        "kinds": {kind: kind_stats.summary(elapsed) for kind, kind_stats in sorted(stats.items())}
+    }
+
+
+def render_start_command(port, workers):
+    """startCommand from render.yaml with $PORT filled in, plus --workers if given."""
+    with open(os.path.join(REPO_ROOT, 'render.yaml'), encoding='utf-8') as f:
+        match = re.search(r'^\s*startCommand:\s*(.+)$', f.read(), re.MULTILINE)
+    if not match:
+        raise ValueError("render.yaml has no startCommand")
+    command = match.group(1).strip().replace('$PORT', str(port))
+    if workers:
+        command += f" --workers {workers}"
+    return command
+
+
+def wait_until_ready(url, process, timeout=60.0):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+
+    async def probe():
+        connection = HTTPConnection(parts.hostname, parts.port, {})
+        try:
+            status, _ = await asyncio.wait_for(connection.request('GET', '/api'), 5)
+            return status == 200
+        finally:
+            connection.close()
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode} before it was ready")
+        try:
+            if asyncio.run(probe()):
+                return
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {timeout:.0f}s")
+
+
+def print_report(report):
+    print(f"\n{'kind':<12} {'requests':>9} {'rps':>8} {'errors':>8} {'429s':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for kind, summary in list(report["kinds"].items()) + [("TOTAL", report["total"])]:
+        print(
+            f"{kind:<12} {summary['requests']:>9} {summary['rps']:>8.1f} {summary['error_rate']:>8.2%} {summary['rate_limited']:>6} "
+            f"{summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}"
+        )
+    print(f"\nTarget {report['target_rps'] or 'unpaced'} rps, achieved {report['total']['rps']:.1f} rps over {report['duration']:.1f}s with {report['concurrency']} connections")
+    print("Latency histogram (all requests):")
+    for bound, n in report["total"]["histogram_ms"].items():
+        print(f"  {bound:>8} ms {n:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Closed-loop load test for the recipe API.")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="server to load (default: %(default)s)")
+    parser.add_argument('--rps', type=float, default=20.0, help="target requests/sec across all connections; 0 = as fast as possible")
+    parser.add_argument('--duration', type=float, default=30.0, help="measured seconds")
+    parser.add_argument('--warmup', type=float, default=2.0, help="seconds of load before measuring starts")
+    parser.add_argument('--concurrency', type=int, default=10, help="keep-alive connections (virtual users)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="request kinds and weights (default: %(default)s)")
+    parser.add_argument('--token', default=os.getenv("LOAD_TEST_TOKEN", ""), help="rate-limit bypass token (default: $LOAD_TEST_TOKEN)")
+    parser.add_argument('--no-bypass', action='store_true', help="send no token, so rate limits apply")
+    parser.add_argument('--seed', type=int, default=1, help="seed for the request mix")
+    parser.add_argument('--spawn', action='store_true', help="start the server with the render.yaml startCommand first")
+    parser.add_argument('--workers', type=int, default=0, help="with --spawn: gunicorn worker processes")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.no_bypass:
+        args.token = ''
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    process = None
+    if args.spawn:
+        port = urlsplit(args.url).port or 5000
+        if not args.no_bypass:
+            args.token = args.token or secrets.token_hex(16)
+        command = render_start_command(port, args.workers)
+        print(f"Starting: {command}")
+        process = subprocess.Popen(shlex.split(command), cwd=REPO_ROOT, env={**os.environ, "PORT": str(port), "LOAD_TEST_TOKEN": args.token})
+    try:
+        if process:
+            wait_until_ready(args.url, process)
+        report = asyncio.run(run_load(args.url, mix, args.rps, args.duration, args.concurrency, args.warmup, args.token, args.seed))
+    finally:
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
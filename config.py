@@ -6,16 +6,13 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
 from dotenv import load_dotenv
+from logging_setup import configure_logging
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(
-    filename="recipe_generator.log",
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s - %(pathname)s:%(lineno)d",
-)
+configure_logging()
 
 # Initialize Flask app
 app = Flask(__name__)
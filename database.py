@@ -2,39 +2,370 @@ import sqlite3
 import json
 import os
 import logging
+import re
+import threading
+import time
+import weakref
+
+from pairings import FLAVOR_PAIRS
+from recipes_data import RANDOM_RECIPES
 
 DATABASE_FILE = 'recipes.db'
 
-# Expanded flavor pairing dictionary
-FLAVOR_PAIRS = {
-    "chicken": ["garlic", "onion", "lime", "cilantro", "curry", "ginger", "soy sauce", "rosemary", "thyme", "paprika"],
-    "tofu": ["soy sauce", "ginger", "garlic", "sesame oil", "chili", "peanuts", "scallions"],
-    "beef": ["mushrooms", "onion", "garlic", "rosemary", "thyme", "red wine", "black pepper"],
-    "shrimp": ["garlic", "lemon", "chili", "cilantro", "lime", "butter", "parsley"],
-    "bacon": ["egg", "onion", "garlic", "cheese", "potatoes", "black pepper", "thyme"],
-    "egg": ["bacon", "cheese", "onion", "spinach", "tomatoes", "chives", "black pepper"],
-    "pork": ["apple", "onion", "garlic", "thyme", "rosemary", "mustard", "sage"],
-    "fish": ["lemon", "dill", "garlic", "olive oil", "capers", "parsley", "white wine"],
-    "salmon": ["lemon", "dill", "garlic", "honey", "soy sauce", "ginger", "sesame"],
-    "lamb": ["rosemary", "garlic", "thyme", "mint", "red wine", "cumin", "yogurt"]
-}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "1"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_CACHE_KB = int(os.getenv("DB_CACHE_KB", "16384"))
+DB_CACHED_STATEMENTS = int(os.getenv("DB_CACHED_STATEMENTS", "256"))
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that goes back to its pool instead of closing.
+
+    Leaving a `with` block commits or rolls back as usual and then releases
+    the connection, so existing `with get_db_connection() as conn:` callers
+    need no changes.
+    """
+
+    pool = None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            self.close()
+
+    def close(self):
+        """Return the connection to its pool; closing it again is a no-op."""
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.release(self)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of tuned SQLite connections.
+
+    Idle connections are reused LIFO so the hottest page cache is served
+    first. When all max_size connections are checked out a caller waits up
+    to timeout seconds, then gets an overflow connection that is closed
+    rather than pooled on release. The pool is discarded after a fork.
+    """
+
+    def __init__(self, path, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = []
+        self._connecting = 0
+        # Weak, so a connection that is never released stops counting once it is collected
+        self._members = weakref.WeakSet()
+        self._open = weakref.WeakSet()
+        self.acquired = 0
+        self.waits = 0
+        self.overflows = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5,
+            check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS,
+            factory=PooledConnection
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB}")
+        return conn
+
+    def acquire(self):
+        with self._cond:
+            if self._pid != os.getpid():
+                self._reset()
+            self.acquired += 1
+            if not self._idle and self._capacity() <= 0:
+                started = time.monotonic()
+                self._cond.wait_for(lambda: self._idle, timeout=self.timeout)
+                waited = time.monotonic() - started
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            if self._idle:
+                conn = self._idle.pop()
+                conn.pool = self
+                return conn
+            pooled = self._capacity() > 0
+            if pooled:
+                self._connecting += 1
+            else:
+                self.overflows += 1
+        try:
+            conn = self._connect()
+        finally:
+            if pooled:
+                with self._cond:
+                    self._connecting -= 1
+        with self._cond:
+            self._open.add(conn)
+            if pooled:
+                self._members.add(conn)
+        conn.pool = self
+        return conn
+
+    def _capacity(self):
+        return self.max_size - len(self._members) - self._connecting
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            if conn in self._members and self._pid == os.getpid():
+                self._idle.append(conn)
+                self._cond.notify()
+                return
+            self._open.discard(conn)
+        sqlite3.Connection.close(conn)
+
+    def stats(self):
+        with self._cond:
+            open_connections = len(self._open)
+            return {
+                "path": self.path,
+                "max_size": self.max_size,
+                "open": open_connections,
+                "idle": len(self._idle),
+                "in_use": open_connections - len(self._idle),
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "overflows": self.overflows,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "max_wait_seconds": round(self.max_wait_seconds, 6)
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The connection pool for the current DATABASE_FILE."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DATABASE_FILE:
+            _pool = ConnectionPool(DATABASE_FILE)
+        return _pool
+
 
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Check out a pooled connection; `with` or close() returns it to the pool."""
+    return get_pool().acquire()
 
-def init_db():
-    if os.path.exists(DATABASE_FILE):
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM recipes")
-            count = cursor.fetchone()[0]
-            if count > 0:
-                logging.info(f"Recipes table already has {count} entries")
+
+def pool_stats():
+    return get_pool().stats()
+
+# Keep recipe_ingredients in sync with the JSON ingredients column of recipes
+RECIPE_INGREDIENT_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_ingredients_ai AFTER INSERT ON recipes
+    WHEN json_valid(NEW.ingredients)
+    BEGIN
+        INSERT OR IGNORE INTO recipe_ingredients (recipe_id, ingredient)
+        SELECT NEW.id, value FROM json_each(NEW.ingredients) WHERE type = 'text';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_ingredients_au AFTER UPDATE OF ingredients ON recipes
+    BEGIN
+        DELETE FROM recipe_ingredients WHERE recipe_id = OLD.id;
+        INSERT OR IGNORE INTO recipe_ingredients (recipe_id, ingredient)
+        SELECT NEW.id, value FROM json_each(CASE WHEN json_valid(NEW.ingredients) THEN NEW.ingredients ELSE '[]' END)
+        WHERE type = 'text';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_ingredients_ad AFTER DELETE ON recipes
+    BEGIN
+        DELETE FROM recipe_ingredients WHERE recipe_id = OLD.id;
+    END
+    '''
+)
+
+# Keep the recipes_fts index in sync with recipes. Rows are read through the
+# recipe_search_text view both when indexing and when removing, so the
+# 'delete' commands always see exactly the text that was indexed.
+RECIPE_FTS_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes
+    BEGIN
+        INSERT INTO recipes_fts (rowid, title_en, title_es, steps_en, steps_es, ingredients)
+        SELECT id, title_en, title_es, steps_en, steps_es, ingredients FROM recipe_search_text WHERE id = NEW.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_bu BEFORE UPDATE OF title_en, title_es, steps_en, steps_es, ingredients ON recipes
+    BEGIN
+        INSERT INTO recipes_fts (recipes_fts, rowid, title_en, title_es, steps_en, steps_es, ingredients)
+        SELECT 'delete', id, title_en, title_es, steps_en, steps_es, ingredients FROM recipe_search_text WHERE id = OLD.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE OF title_en, title_es, steps_en, steps_es, ingredients ON recipes
+    BEGIN
+        INSERT INTO recipes_fts (rowid, title_en, title_es, steps_en, steps_es, ingredients)
+        SELECT id, title_en, title_es, steps_en, steps_es, ingredients FROM recipe_search_text WHERE id = NEW.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_bd BEFORE DELETE ON recipes
+    BEGIN
+        INSERT INTO recipes_fts (recipes_fts, rowid, title_en, title_es, steps_en, steps_es, ingredients)
+        SELECT 'delete', id, title_en, title_es, steps_en, steps_es, ingredients FROM recipe_search_text WHERE id = OLD.id;
+    END
+    '''
+)
+
+# Bump catalog_state.version on every change to recipe content. Rating
+# updates leave it alone, so the in-memory catalog can tell a rating flush
+# (any commit bumps PRAGMA data_version) from a change worth a full reload.
+CATALOG_VERSION_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_version_ai AFTER INSERT ON recipes
+    BEGIN
+        UPDATE catalog_state SET version = version + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_version_au
+    AFTER UPDATE OF title_en, title_es, steps_en, steps_es, ingredients, nutrition, cooking_time, difficulty ON recipes
+    BEGIN
+        UPDATE catalog_state SET version = version + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_version_ad AFTER DELETE ON recipes
+    BEGIN
+        UPDATE catalog_state SET version = version + 1 WHERE id = 1;
+    END
+    '''
+)
+
+
+def _json_text(column):
+    """SQL expression joining the strings of a JSON array column with spaces, decoding \\u escapes."""
+    return f"(SELECT group_concat(value, ' ') FROM json_each(CASE WHEN json_valid({column}) THEN {column} ELSE '[]' END))"
+
+# Relative BM25 weight of each recipes_fts column: a title hit outranks a mention in the steps
+SEARCH_WEIGHTS = (10.0, 10.0, 1.0, 1.0, 5.0)
+
+# Secondary indexes, by name, that bulk loads may drop and rebuild
+RECIPE_INDEXES = {
+    'idx_recipe_ingredients_ingredient': "CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_ingredient ON recipe_ingredients (ingredient)",
+    'idx_recipes_calories': "CREATE INDEX IF NOT EXISTS idx_recipes_calories ON recipes (calories)"
+}
+
+RECIPE_COLUMNS = ('title_en', 'title_es', 'steps_en', 'steps_es', 'ingredients', 'nutrition', 'cooking_time', 'difficulty', 'rating', 'rating_count')
+
+# Schema changes applied on top of the original recipes table, in order.
+# PRAGMA user_version records how many have run, so existing recipes.db
+# files are upgraded in place on the next init_db().
+MIGRATIONS = [
+    (
+        # Normalized ingredient lookup, backfilled here and kept in sync by the triggers
+        '''
+        CREATE TABLE IF NOT EXISTS recipe_ingredients (
+            recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+            ingredient TEXT NOT NULL,
+            PRIMARY KEY (recipe_id, ingredient)
+        ) WITHOUT ROWID
+        ''',
+        RECIPE_INDEXES['idx_recipe_ingredients_ingredient'],
+        '''
+        INSERT OR IGNORE INTO recipe_ingredients (recipe_id, ingredient)
+        SELECT recipes.id, value
+        FROM recipes, json_each(CASE WHEN json_valid(recipes.ingredients) THEN recipes.ingredients ELSE '[]' END)
+        WHERE type = 'text'
+        ''',
+        # Typed nutrition columns, computed from the JSON blob so they never drift from it
+        "ALTER TABLE recipes ADD COLUMN calories REAL GENERATED ALWAYS AS (json_extract(nutrition, '$.calories')) VIRTUAL",
+        "ALTER TABLE recipes ADD COLUMN protein REAL GENERATED ALWAYS AS (json_extract(nutrition, '$.protein')) VIRTUAL",
+        "ALTER TABLE recipes ADD COLUMN fat REAL GENERATED ALWAYS AS (json_extract(nutrition, '$.fat')) VIRTUAL",
+        RECIPE_INDEXES['idx_recipes_calories'],
+    ) + RECIPE_INGREDIENT_TRIGGERS,
+    (
+        # The JSON list columns are stored with escaped non-ASCII text; index them decoded
+        f'''
+        CREATE VIEW IF NOT EXISTS recipe_search_text AS
+        SELECT id, title_en, title_es,
+               {_json_text('steps_en')} AS steps_en,
+               {_json_text('steps_es')} AS steps_es,
+               {_json_text('ingredients')} AS ingredients
+        FROM recipes
+        ''',
+        # Full-text index over titles, steps and ingredients; diacritics folded so "sesamo" finds "sésamo"
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+            title_en, title_es, steps_en, steps_es, ingredients,
+            content='recipe_search_text', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        # FTS5 'rebuild' cannot scan a view with correlated subqueries, so backfill with a plain insert
+        "INSERT INTO recipes_fts (rowid, title_en, title_es, steps_en, steps_es, ingredients) SELECT * FROM recipe_search_text",
+    ) + RECIPE_FTS_TRIGGERS,
+    (
+        # Precomputed "more like this" neighbors, rewritten wholesale by similarity.py
+        '''
+        CREATE TABLE IF NOT EXISTS recipe_similar (
+            recipe_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            similar_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (recipe_id, rank)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE TABLE IF NOT EXISTS similarity_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    ),
+    (
+        # Content watermark for the recipe catalog, maintained by CATALOG_VERSION_TRIGGERS
+        "CREATE TABLE IF NOT EXISTS catalog_state (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO catalog_state (id, version) VALUES (1, 0)",
+    ) + CATALOG_VERSION_TRIGGERS,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn):
+    """Bring the schema up to SCHEMA_VERSION, one transaction per migration."""
+    if conn.in_transaction:
+        conn.commit()
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Read under the write lock so concurrent workers never apply a migration twice
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
                 return
+            for statement in MIGRATIONS[version]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        logging.info("Migrated %s to schema version %s", DATABASE_FILE, version + 1)
 
-    logging.info("Recipes table is empty, populating with initial data")
+
+def init_db():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -52,6 +383,14 @@ def init_db():
                 rating_count INTEGER DEFAULT 0
             )
         ''')
+        migrate(conn)
+        cursor.execute("SELECT COUNT(*) FROM recipes")
+        count = cursor.fetchone()[0]
+        if count > 0:
+            logging.info("Recipes table already has %s entries", count)
+            return
+
+        logging.info("Recipes table is empty, populating with initial data")
 
         initial_recipes = [
             {
@@ -79,44 +418,184 @@ def init_db():
             # ... (other recipes unchanged for brevity, assume all 15 are here)
         ]
 
-        for recipe in initial_recipes:
-            cursor.execute('''
-                INSERT INTO recipes (title_en, title_es, steps_en, steps_es, ingredients, nutrition, cooking_time, difficulty)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                recipe['title_en'],
-                recipe['title_es'],
-                json.dumps(recipe['steps_en']),
-                json.dumps(recipe['steps_es']),
-                json.dumps(recipe['ingredients']),
-                json.dumps(recipe['nutrition']),
-                recipe['cooking_time'],
-                recipe['difficulty']
-            ))
-        conn.commit()
-        logging.info(f"Inserted {len(initial_recipes)} recipes into the database")
+        from recipe_import import import_recipes
+        report = import_recipes(initial_recipes + RANDOM_RECIPES)
+        logging.info("Inserted %s recipes into the database", report['imported'])
+
+def _trigger_name(statement):
+    return re.search(r"CREATE TRIGGER IF NOT EXISTS (\w+)", statement).group(1)
+
+def bulk_insert_recipes(conn, batches, defer_indexes=True):
+    """Insert batches of RECIPE_COLUMNS rows inside the caller's transaction; returns the row count.
+
+    With defer_indexes the sync triggers and secondary indexes are dropped
+    for the load, then recipe_ingredients and recipes_fts are filled for
+    the new rows in one set-based pass and everything is recreated. Being
+    DDL inside the same transaction, a rollback restores all of it.
+    """
+    triggers = RECIPE_INGREDIENT_TRIGGERS + RECIPE_FTS_TRIGGERS + CATALOG_VERSION_TRIGGERS
+    first_new_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM recipes").fetchone()[0]
+    if defer_indexes:
+        for trigger in triggers:
+            conn.execute(f"DROP TRIGGER IF EXISTS {_trigger_name(trigger)}")
+        for name in RECIPE_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    placeholders = ", ".join("?" for _ in RECIPE_COLUMNS)
+    insert = f"INSERT INTO recipes ({', '.join(RECIPE_COLUMNS)}) VALUES ({placeholders})"
+    count = 0
+    for rows in batches:
+        conn.executemany(insert, rows)
+        count += len(rows)
+    if defer_indexes:
+        conn.execute('''
+            INSERT OR IGNORE INTO recipe_ingredients (recipe_id, ingredient)
+            SELECT recipes.id, value
+            FROM recipes, json_each(CASE WHEN json_valid(recipes.ingredients) THEN recipes.ingredients ELSE '[]' END)
+            WHERE recipes.id >= ? AND type = 'text'
+        ''', (first_new_id,))
+        conn.execute(
+            "INSERT INTO recipes_fts (rowid, title_en, title_es, steps_en, steps_es, ingredients) SELECT * FROM recipe_search_text WHERE id >= ?",
+            (first_new_id,)
+        )
+        if count:
+            # One bump for the whole load instead of one per row
+            conn.execute("UPDATE catalog_state SET version = version + 1 WHERE id = 1")
+        for statement in tuple(RECIPE_INDEXES.values()) + triggers:
+            conn.execute(statement)
+    return count
+
+def _row_to_recipe(row):
+    return {
+        "id": row['id'],
+        "title_en": row['title_en'],
+        "title_es": row['title_es'],
+        "steps_en": json.loads(row['steps_en']),
+        "steps_es": json.loads(row['steps_es']),
+        "ingredients": json.loads(row['ingredients']),
+        "nutrition": json.loads(row['nutrition']),
+        "cooking_time": row['cooking_time'],
+        "difficulty": row['difficulty'],
+        "rating": row['rating'],
+        "rating_count": row['rating_count']
+    }
 
 def get_all_recipes():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM recipes")
         rows = cursor.fetchall()
-        recipes = []
-        for row in rows:
-            recipes.append({
-                "id": row['id'],
-                "title_en": row['title_en'],
-                "title_es": row['title_es'],
-                "steps_en": json.loads(row['steps_en']),
-                "steps_es": json.loads(row['steps_es']),
-                "ingredients": json.loads(row['ingredients']),
-                "nutrition": json.loads(row['nutrition']),
-                "cooking_time": row['cooking_time'],
-                "difficulty": row['difficulty'],
-                "rating": row['rating'],
-                "rating_count": row['rating_count']
-            })
-        return recipes
+        return [_row_to_recipe(row) for row in rows]
+
+def find_recipes_with_ingredients(ingredients, limit=None, ranked=False):
+    """Recipes containing every ingredient, via the recipe_ingredients index.
+
+    Results come in id order, or with ranked=True closest match first: fewest
+    extra ingredients, then best rating, then id.
+    """
+    wanted = sorted(set(ingredients))
+    matches = ""
+    params = []
+    if wanted:
+        placeholders = ", ".join("?" for _ in wanted)
+        matches = f'''
+            JOIN (
+                SELECT recipe_id FROM recipe_ingredients
+                WHERE ingredient IN ({placeholders})
+                GROUP BY recipe_id HAVING COUNT(*) = ?
+            ) m ON m.recipe_id = r.id
+        '''
+        params = wanted + [len(wanted)]
+    order = "(SELECT COUNT(*) FROM recipe_ingredients x WHERE x.recipe_id = r.id), COALESCE(r.rating, 0) DESC, r.id" if ranked else "r.id"
+    query = f"SELECT r.* FROM recipes r {matches} ORDER BY {order} LIMIT ?"
+    params.append(-1 if limit is None else limit)
+    with get_db_connection() as conn:
+        return [_row_to_recipe(row) for row in conn.execute(query, params)]
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching every word as a prefix, or None if it has no words."""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_recipes(text, limit=10, offset=0):
+    """BM25-ranked full-text search. Returns (total matches, recipes for this page with their scores)."""
+    query = fts_query(text)
+    if query is None:
+        return 0, []
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+    with get_db_connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM recipes_fts WHERE recipes_fts MATCH ?", (query,)).fetchone()[0]
+        rows = conn.execute(f'''
+            SELECT r.*, bm25(recipes_fts, {weights}) AS score
+            FROM recipes_fts JOIN recipes r ON r.id = recipes_fts.rowid
+            WHERE recipes_fts MATCH ?
+            ORDER BY score, r.id
+            LIMIT ? OFFSET ?
+        ''', (query, limit, offset)).fetchall()
+    results = []
+    for row in rows:
+        recipe = _row_to_recipe(row)
+        # bm25() is lower-is-better; flip it so clients see higher scores as better matches
+        recipe['score'] = round(-row['score'], 4)
+        results.append(recipe)
+    return total, results
+
+def get_random_recipe(rng):
+    """A random recipe, or None when the table is empty, in O(log n).
+
+    An id is drawn uniformly between MIN(id) and MAX(id) and the first
+    recipe at or after it is returned, so both lookups walk the primary key
+    instead of scanning. A recipe that follows a gap left by deleted ids is
+    correspondingly more likely. Both statements run in one read
+    transaction, so a concurrent delete cannot leave the pick pointing
+    past the last row.
+    """
+    with get_db_connection() as conn:
+        conn.execute("BEGIN")
+        low, high = conn.execute("SELECT MIN(id), MAX(id) FROM recipes").fetchone()
+        if low is None:
+            return None
+        row = conn.execute("SELECT * FROM recipes WHERE id >= ? ORDER BY id LIMIT 1", (rng.randint(low, high),)).fetchone()
+        return _row_to_recipe(row) if row else None
+
+def get_similarity_fingerprint():
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT value FROM similarity_meta WHERE key = 'fingerprint'").fetchone()
+        return row[0] if row else None
+
+def get_catalog_version(conn):
+    """The content watermark of the recipes table, read on conn; rating updates do not move it."""
+    return conn.execute("SELECT version FROM catalog_state WHERE id = 1").fetchone()[0]
+
+def get_ratings():
+    """{recipe_id: (rating, rating_count)} for every recipe."""
+    with get_db_connection() as conn:
+        return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT id, rating, rating_count FROM recipes")}
+
+def get_similar_rows():
+    """Every stored (recipe_id, rank, similar_id, score) row, in key order."""
+    with get_db_connection() as conn:
+        return [tuple(row) for row in conn.execute("SELECT recipe_id, rank, similar_id, score FROM recipe_similar ORDER BY recipe_id, rank")]
+
+def store_similar(rows, fingerprint, replace_rows=True):
+    """Replace all stored neighbors with (recipe_id, rank, similar_id, score) rows in one transaction.
+
+    With replace_rows=False only the fingerprint is updated, for a rebuild
+    that produced the rows already stored.
+    """
+    with get_db_connection() as conn:
+        if replace_rows:
+            conn.execute("DELETE FROM recipe_similar")
+            conn.executemany("INSERT INTO recipe_similar (recipe_id, rank, similar_id, score) VALUES (?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO similarity_meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+
+def get_similar(recipe_id, limit=10):
+    """Stored (similar_id, score) neighbors of a recipe, best first."""
+    with get_db_connection() as conn:
+        return [tuple(row) for row in conn.execute(
+            "SELECT similar_id, score FROM recipe_similar WHERE recipe_id = ? ORDER BY rank LIMIT ?", (recipe_id, limit)
+        )]
 
 def get_flavor_pairs():
     return FLAVOR_PAIRS
\ No newline at end of file
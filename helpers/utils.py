@@ -4,10 +4,10 @@ import logging
 def validate_input(data):
     """Validate incoming request data."""
     if not isinstance(data, dict):
-        logging.error("Invalid input: Expected a dictionary")
+        logging.warning("Invalid input: Expected a dictionary")
         return False
     if "ingredients" not in data or not isinstance(data["ingredients"], list):
-        logging.error("Invalid input: 'ingredients' missing or not a list")
+        logging.warning("Invalid input: 'ingredients' missing or not a list")
         return False
     return True
 
@@ -25,4 +25,4 @@ def score_recipe(recipe, ingredients):
 
 def log_request(request_data):
     """Log incoming API requests for debugging."""
-    logging.debug(f"Received request data: {request_data}")
\ No newline at end of file
+    logging.debug("Received request data: %s", request_data)
\ No newline at end of file
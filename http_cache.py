@@ -0,0 +1,41 @@
+import hashlib
+import json
+
+from flask import Response, request
+
+
+class PrecomputedJSON:
+    """A JSON payload encoded once and served with a strong ETag.
+
+    Conditional GETs whose If-None-Match matches the ETag get an empty 304.
+    """
+
+    def __init__(self, payload, max_age=3600):
+        self.body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}"
+
+    def response(self):
+        if request.if_none_match.contains_weak(self.etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.body, mimetype="application/json")
+        response.set_etag(self.etag)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+def add_strong_etag(response, max_age=3600):
+    """Tag a reproducible response with a content-hash ETag.
+
+    GET and HEAD requests whose If-None-Match matches get an empty 304 and
+    are cacheable for max_age seconds. Other methods keep the ETag but are
+    marked no-cache: a POST body is not part of a shared cache's key.
+    """
+    etag = hashlib.sha256(response.get_data()).hexdigest()[:32]
+    cacheable = request.method in ("GET", "HEAD")
+    if cacheable and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}" if cacheable else "private, no-cache"
+    return response
@@ -0,0 +1,60 @@
+import heapq
+
+
+class IngredientIndex:
+    """Inverted index from ingredient name to the catalog positions that use it.
+
+    Positions refer to the recipe tuple the index was built from, so results
+    can be resolved against the same catalog snapshot in O(1).
+    """
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        postings = {}
+        for position, recipe in enumerate(recipes):
+            for ing in set(_names(recipe.get('ingredients'))):
+                postings.setdefault(ing, []).append(position)
+        self.postings = {ing: frozenset(positions) for ing, positions in postings.items()}
+
+    def match_all(self, ingredients):
+        """Return the sorted positions of recipes containing every ingredient."""
+        wanted = set(ingredients)
+        if not wanted:
+            return list(range(len(self.recipes)))
+        lists = []
+        for ing in wanted:
+            posting = self.postings.get(ing)
+            if not posting:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        matches = lists[0]
+        for posting in lists[1:]:
+            matches = matches.intersection(posting)
+            if not matches:
+                return []
+        return sorted(matches)
+
+    def first_match(self, ingredients):
+        """Position of the first recipe (in catalog order) containing every ingredient, or None."""
+        matches = self.match_all(ingredients)
+        return matches[0] if matches else None
+
+    def top_k(self, ingredients, k=5):
+        """Up to k matching positions, closest first.
+
+        Recipes with fewer ingredients beyond the requested ones rank higher;
+        ties go to the better rated recipe, then to catalog order.
+        """
+        wanted = len(set(ingredients))
+
+        def rank(position):
+            recipe = self.recipes[position]
+            extras = len(set(_names(recipe.get('ingredients')))) - wanted
+            return (extras, -(recipe.get('rating') or 0), position)
+
+        return heapq.nsmallest(k, self.match_all(ingredients), key=rank)
+
+
+def _names(ingredients):
+    return [ing for ing in ingredients or [] if isinstance(ing, str)]
@@ -0,0 +1,159 @@
+"""Application logging: structured, sampled and written off the request path.
+
+configure_logging() points the root logger at a QueueHandler, so a request
+thread only pays for the level check, the sampling check and a queue put.
+A QueueListener thread merges the message with its args, formats the
+record and writes it to the file and console handlers.
+
+    LOG_LEVEL         root level (default INFO)
+    LOG_FORMAT        json, one object per line (default), or text
+    LOG_FILE          log file (default recipe_generator.log; empty disables it)
+    LOG_CONSOLE       also log to stderr (default on)
+    LOG_SAMPLE_RATES  fraction of records kept per level, e.g. "DEBUG=0.01,INFO=0.5"
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s - %(pathname)s:%(lineno)d'
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+def parse_sample_rates(text):
+    """{levelno: keep fraction} from "DEBUG=0.01,INFO=0.5"."""
+    rates = {}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition('=')
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in LOG_SAMPLE_RATES: {name.strip()}")
+        rates[level] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps each record with its level's probability; levels without a rate are always kept."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        # Own generator, so sampling never shifts the global random stream
+        self._rng = random.Random()
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or self._rng.random() < rate
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queues the record untouched; the listener thread does the message formatting.
+
+    The stock prepare() formats the message on the calling thread so the
+    record can be pickled. This queue never leaves the process, so that
+    work (and the str() of large args) moves to the listener. The args are
+    rendered when the listener gets to them, so log a copy of anything the
+    caller mutates right after logging it.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; fields passed with extra={...} are included as-is."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "pid": record.process
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_FIELDS and name not in entry:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+_queue_handler = None
+_listener = None
+
+
+def _output_handlers():
+    log_format = os.getenv("LOG_FORMAT", "json").lower()
+    log_file = os.getenv("LOG_FILE", "recipe_generator.log")
+    formatter = JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    if os.getenv("LOG_CONSOLE", "1").lower() in ("1", "true", "yes"):
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _start_listener(handlers):
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_after_fork():
+    # The listener thread does not survive a fork; the child gets a fresh queue and thread
+    if _listener is not None:
+        _start_listener(_listener.handlers)
+
+
+def stop_logging():
+    """Drain the queue and stop the listener thread."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def configure_logging():
+    """Route the root logger through the background listener; later calls are no-ops.
+
+    The LOG_* variables are read here rather than at import, so values
+    loaded from .env just before the call still apply.
+    """
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+    _queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+    if rates:
+        _queue_handler.addFilter(SamplingFilter(rates))
+    _start_listener(_output_handlers())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    werkzeug_logger = logging.getLogger('werkzeug')
+    werkzeug_logger.setLevel(logging.ERROR)
+    werkzeug_logger.propagate = False
+
+    atexit.register(stop_logging)
+    os.register_at_fork(after_in_child=_restart_after_fork)
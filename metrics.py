@@ -0,0 +1,211 @@
+"""Per-stage latency histograms for /generate_recipe, in Prometheus text format.
+
+A timed request calls start_timing(); every `with stage(name):` block inside
+it then adds its wall time to that request's totals. When the request ends
+(after the last line of a streamed body, too) each stage is observed once
+into recipe_stage_seconds{stage, branch, cache}. Outside a timed request
+stage() costs one flask.g lookup.
+
+With METRICS_MULTIPROC_DIR (or PROMETHEUS_MULTIPROC_DIR) set, each process
+also writes its histograms to <dir>/stages_<pid>.json at most every
+METRICS_WRITE_INTERVAL seconds and at exit, and collect() merges every file
+in the directory, so whichever gunicorn worker serves /metrics reports for
+all of them. Files of exited workers are kept so their counts stay in the
+totals; clear the directory when the server starts.
+"""
+import atexit
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_WRITE_INTERVAL = float(os.getenv("METRICS_WRITE_INTERVAL", "5"))
+
+METRIC_NAME = 'recipe_stage_seconds'
+LABELS = ('stage', 'branch', 'cache')
+# Upper bounds in seconds, from sub-millisecond cache hits to multi-second scoring
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class StageHistogram:
+    """Bucket counts and a running sum per (stage, branch, cache) label set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        # A forked worker starts from zero; the parent's counts are reported by the parent
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._series = {}
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            self._check_pid()
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(BUCKETS) + 1), 0.0]
+            series[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+            series[1] += seconds
+
+    def snapshot(self):
+        """{labels: (bucket counts, sum)} for this process."""
+        with self._lock:
+            self._check_pid()
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+
+stage_histogram = StageHistogram()
+_last_write = 0.0
+
+
+def _process_file(pid):
+    return os.path.join(METRICS_MULTIPROC_DIR, f"stages_{pid}.json")
+
+
+def write_process_metrics():
+    """Write this process's histograms to the shared directory, atomically."""
+    global _last_write
+    if not METRICS_MULTIPROC_DIR:
+        return
+    _last_write = time.monotonic()
+    rows = [{"labels": list(labels), "counts": counts, "sum": total} for labels, (counts, total) in stage_histogram.snapshot().items()]
+    path = _process_file(os.getpid())
+    try:
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(rows, f)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        logging.error("Could not write metrics to %s: %s", path, e)
+
+
+def collect():
+    """This process's histograms merged with every other process's file in the shared directory."""
+    merged = stage_histogram.snapshot()
+    if not METRICS_MULTIPROC_DIR:
+        return merged
+    own = _process_file(os.getpid())
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, 'stages_*.json')):
+        if path == own:
+            continue
+        try:
+            with open(path, encoding='utf-8') as f:
+                rows = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Skipping unreadable metrics file %s: %s", path, e)
+            continue
+        for row in rows:
+            labels = tuple(row['labels'])
+            counts, total = merged.get(labels, ([0] * (len(BUCKETS) + 1), 0.0))
+            merged[labels] = ([a + b for a, b in zip(counts, row['counts'])], total + row['sum'])
+    return merged
+
+
+def start_timing():
+    """Time the stages of the current request; they are recorded when the request ends."""
+    g._stage_seconds = {}
+    g._stage_labels = {'branch': 'none', 'cache': 'none'}
+    g._timing_started = time.perf_counter()
+
+
+@contextmanager
+def stage(name):
+    timings = g.get('_stage_seconds') if has_request_context() else None
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def label_request(**labels):
+    """Set the branch/cache labels of the current timed request."""
+    if has_request_context() and '_stage_labels' in g:
+        g._stage_labels.update(labels)
+
+
+def finish_timing(exc=None):
+    """teardown_request hook: observe every stage of a timed request, plus its total."""
+    timings = g.pop('_stage_seconds', None)
+    if timings is None:
+        return
+    labels = g.pop('_stage_labels')
+    timings['total'] = time.perf_counter() - g.pop('_timing_started')
+    for name, seconds in timings.items():
+        stage_histogram.observe((name, labels['branch'], labels['cache']), seconds)
+    if METRICS_MULTIPROC_DIR and time.monotonic() - _last_write >= METRICS_WRITE_INTERVAL:
+        write_process_metrics()
+
+
+def _format_bound(bound):
+    return f"{bound:g}"
+
+
+def prometheus_text(series=None):
+    """Histograms in the Prometheus text exposition format."""
+    series = collect() if series is None else series
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each stage of /generate_recipe.",
+        f"# TYPE {METRIC_NAME} histogram"
+    ]
+    for labels in sorted(series):
+        counts, total = series[labels]
+        label_text = ','.join(f'{name}="{value}"' for name, value in zip(LABELS, labels))
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), counts):
+            cumulative += count
+            le = bound if bound == '+Inf' else _format_bound(bound)
+            lines.append(f'{METRIC_NAME}_bucket{{{label_text},le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_sum{{{label_text}}} {total!r}')
+        lines.append(f'{METRIC_NAME}_count{{{label_text}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def bucket_quantile(counts, q):
+    """Estimate the q-quantile from bucket counts by linear interpolation, like histogram_quantile()."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count:
+            if i == len(BUCKETS):
+                # Past the last finite bucket all we know is "more than that"
+                return BUCKETS[-1]
+            lower = BUCKETS[i - 1] if i else 0.0
+            return lower + (BUCKETS[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return BUCKETS[-1]
+
+
+def stage_stats(series=None):
+    """Count, mean and p50/p95/p99 (seconds) per stage and label set, for the JSON stats endpoint."""
+    series = collect() if series is None else series
+    stats = []
+    for labels in sorted(series):
+        counts, total = series[labels]
+        count = sum(counts)
+        entry = dict(zip(LABELS, labels))
+        entry.update({"count": count, "mean": round(total / count, 6) if count else 0.0})
+        for q in QUANTILES:
+            entry[f"p{round(q * 100)}"] = round(bucket_quantile(counts, q), 6)
+        stats.append(entry)
+    return stats
+
+
+atexit.register(write_process_metrics)
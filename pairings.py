@@ -0,0 +1,29 @@
+"""Ingredient pairing tables, kept free of import side effects.
+
+FLAVOR_PAIRS seeds flavor pairing suggestions; INGREDIENT_PAIRS drives the
+scoring bonus for paired inputs. Both feed the similarity index, so the
+similarity CLI can load them without importing the Flask app.
+"""
+
+# Expanded flavor pairing dictionary
+FLAVOR_PAIRS = {
+    "chicken": ["garlic", "onion", "lime", "cilantro", "curry", "ginger", "soy sauce", "rosemary", "thyme", "paprika"],
+    "tofu": ["soy sauce", "ginger", "garlic", "sesame oil", "chili", "peanuts", "scallions"],
+    "beef": ["mushrooms", "onion", "garlic", "rosemary", "thyme", "red wine", "black pepper"],
+    "shrimp": ["garlic", "lemon", "chili", "cilantro", "lime", "butter", "parsley"],
+    "bacon": ["egg", "onion", "garlic", "cheese", "potatoes", "black pepper", "thyme"],
+    "egg": ["bacon", "cheese", "onion", "spinach", "tomatoes", "chives", "black pepper"],
+    "pork": ["apple", "onion", "garlic", "thyme", "rosemary", "mustard", "sage"],
+    "fish": ["lemon", "dill", "garlic", "olive oil", "capers", "parsley", "white wine"],
+    "salmon": ["lemon", "dill", "garlic", "honey", "soy sauce", "ginger", "sesame"],
+    "lamb": ["rosemary", "garlic", "thyme", "mint", "red wine", "cumin", "yogurt"]
+}
+
+INGREDIENT_PAIRS = {
+    "ground beef": ["beer", "onion", "cheese"],
+    "chicken": ["lemon", "butter", "rice"],
+    "pork": ["apple", "whiskey", "potato"],
+    "salmon": ["lemon", "butter", "vodka"],
+    "moonshine": ["ground beef", "pork", "chicken"],
+    "beer": ["ground beef", "chicken", "bread"]
+}
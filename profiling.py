@@ -0,0 +1,169 @@
+"""On-demand cProfile capture of live requests.
+
+A request wrapped with @profiled runs under cProfile when either
+  - it carries X-Profile: 1 (or ?profile=1) together with X-Admin-Token
+    matching PROFILE_ADMIN_TOKEN, or
+  - it is the Nth request since the last sample, with N = PROFILE_SAMPLE_EVERY
+    (0 turns sampling off; it can be changed at runtime through
+    set_sample_every).
+The top PROFILE_TOP functions by PROFILE_SORT are kept in a ring buffer of
+the last PROFILE_BUFFER_SIZE profiles and the response gets an
+X-Profile-Id header. Only one request is profiled at a time, and each
+process keeps its own buffer. A streamed response is only profiled up to
+the point where its body starts streaming.
+"""
+import collections
+import cProfile
+import functools
+import hmac
+import itertools
+import os
+import pstats
+import threading
+import time
+
+from flask import current_app, request
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "25"))
+PROFILE_SORT = os.getenv("PROFILE_SORT", "tottime")
+
+
+def is_admin():
+    """True when the request carries the configured admin token; always False while none is configured."""
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(
+        request.headers.get('X-Admin-Token', '').encode('utf-8'), PROFILE_ADMIN_TOKEN.encode('utf-8')
+    )
+
+
+def _flag_set():
+    return '1' in (request.headers.get('X-Profile', ''), request.args.get('profile', ''))
+
+
+def top_functions(profiler, limit=PROFILE_TOP, sort=PROFILE_SORT):
+    """The limit most expensive functions of a finished profile, as JSON-ready dicts."""
+    stats = pstats.Stats(profiler).sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        calls, primitive_calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "function": pstats.func_std_string(func),
+            "name": name,
+            "file": filename,
+            "line": line,
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6)
+        })
+    return rows
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the most recent results."""
+
+    def __init__(self, sample_every=PROFILE_SAMPLE_EVERY, buffer_size=PROFILE_BUFFER_SIZE):
+        self.sample_every = sample_every
+        self._profiles = collections.deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        # cProfile cannot run two profilers at once on every Python version; one profiled request at a time
+        self._active = threading.Lock()
+        self._ids = itertools.count(1)
+        self._requests = itertools.count(1)
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    def trigger(self):
+        """'admin' or 'sample' if the current request should be profiled, else None."""
+        if _flag_set() and is_admin():
+            return 'admin'
+        every = self.sample_every
+        if every > 0 and next(self._requests) % every == 0:
+            return 'sample'
+        return None
+
+    def wrap(self, view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            trigger = self.trigger()
+            if trigger is None:
+                return view(*args, **kwargs)
+            if not self._active.acquire(blocking=False):
+                self.skipped_busy += 1
+                return view(*args, **kwargs)
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            try:
+                profiler.enable()
+                try:
+                    response = current_app.make_response(view(*args, **kwargs))
+                finally:
+                    profiler.disable()
+            finally:
+                self._active.release()
+            profile_id = self._store(profiler, trigger, time.perf_counter() - started, response.status_code)
+            response.headers['X-Profile-Id'] = str(profile_id)
+            return response
+        return wrapper
+
+    def _store(self, profiler, trigger, seconds, status):
+        entry = {
+            "id": next(self._ids),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pid": os.getpid(),
+            "method": request.method,
+            "path": request.full_path.rstrip('?'),
+            "trigger": trigger,
+            "status": status,
+            "seconds": round(seconds, 6),
+            "top": top_functions(profiler)
+        }
+        with self._lock:
+            self._profiles.append(entry)
+            self.profiled += 1
+        return entry["id"]
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((entry for entry in self._profiles if entry["id"] == profile_id), None)
+
+    def summaries(self):
+        """Newest first, without the function tables."""
+        with self._lock:
+            return [{name: value for name, value in entry.items() if name != "top"} for entry in reversed(self._profiles)]
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "sample_every": self.sample_every,
+            "buffer_size": self._profiles.maxlen,
+            "profiled": self.profiled,
+            "skipped_busy": self.skipped_busy,
+            "profiles": self.summaries()
+        }
+
+
+request_profiler = RequestProfiler()
+
+
+def profiled(view):
+    """Decorator: profile this view when the current request is triggered."""
+    return request_profiler.wrap(view)
+
+
+def get_profile(profile_id):
+    return request_profiler.get(profile_id)
+
+
+def profile_stats():
+    return request_profiler.stats()
+
+
+def set_sample_every(every):
+    """Profile one request in every `every` from now on; 0 stops sampling."""
+    if isinstance(every, bool) or not isinstance(every, int) or every < 0:
+        raise ValueError("sample_every must be a non-negative integer")
+    request_profiler.sample_every = every
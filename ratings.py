@@ -0,0 +1,163 @@
+"""Write-behind buffer for recipe ratings.
+
+Ratings are summed per recipe in memory and flushed to the recipes table
+every RATING_FLUSH_INTERVAL seconds (or once RATING_FLUSH_MAX ratings are
+pending) as one executemany in one transaction, so a burst of clicks costs
+one write lock per flush rather than one per click. The buffer is flushed
+again at interpreter exit, so a graceful shutdown loses nothing.
+
+A flush only touches the rating columns, which the catalog's content
+watermark ignores: workers reread the ratings but keep their recipe
+snapshot and everything derived from it.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import database
+
+RATING_FLUSH_INTERVAL = float(os.getenv("RATING_FLUSH_INTERVAL", "10"))
+RATING_FLUSH_MAX = int(os.getenv("RATING_FLUSH_MAX", "1000"))
+
+# Bayesian prior for rating_weight: unrated recipes count as PRIOR_COUNT votes of PRIOR_MEAN stars
+PRIOR_MEAN = 3.0
+PRIOR_COUNT = float(os.getenv("RATING_PRIOR_COUNT", "5"))
+
+
+def rating_weight(rating, rating_count):
+    """Selection weight for a recipe: its mean rating shrunk towards PRIOR_MEAN while it has few votes."""
+    rating_count = rating_count or 0
+    return (PRIOR_MEAN * PRIOR_COUNT + (rating or 0.0) * rating_count) / (PRIOR_COUNT + rating_count)
+
+
+class RatingBuffer:
+    """Per-recipe (sum, count) deltas waiting to be folded into recipes.rating."""
+
+    def __init__(self, flush_interval=RATING_FLUSH_INTERVAL, flush_max=RATING_FLUSH_MAX):
+        self.flush_interval = flush_interval
+        self.flush_max = flush_max
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}
+        self._pending_count = 0
+        self._thread = None
+        self._pid = None
+        self.accepted = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.errors = 0
+        self.last_flush_seconds = 0.0
+
+    def add(self, recipe_id, stars):
+        with self._lock:
+            self._ensure_flusher()
+            total, count = self._pending.get(recipe_id, (0.0, 0))
+            self._pending[recipe_id] = (total + stars, count + 1)
+            self._pending_count += 1
+            self.accepted += 1
+            if self._pending_count >= self.flush_max:
+                self._wake.set()
+
+    def _ensure_flusher(self):
+        # A forked worker inherits the buffer but not the thread; start one per process
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._pending = {}
+            self._pending_count = 0
+            self._thread = threading.Thread(target=self._run, name="rating-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # The thread must outlive any one bad flush, or ratings would pile up unwritten
+                logging.error("Rating flusher error: %s", e, exc_info=True)
+
+    def flush(self):
+        """Fold all pending ratings into the recipes table in one transaction; returns the number flushed."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_count = 0
+            if not pending:
+                return 0
+            started = time.perf_counter()
+            # Running mean: new = (old * n + sum) / (n + k), applied to the row's current values
+            rows = [(total, count, count, recipe_id) for recipe_id, (total, count) in pending.items()]
+            try:
+                with database.get_db_connection() as conn:
+                    conn.executemany('''
+                        UPDATE recipes
+                        SET rating = (COALESCE(rating, 0) * COALESCE(rating_count, 0) + ?) / (COALESCE(rating_count, 0) + ?),
+                            rating_count = COALESCE(rating_count, 0) + ?
+                        WHERE id = ?
+                    ''', rows)
+            except Exception as e:
+                logging.error("Rating flush failed, keeping %s recipes pending: %s", len(pending), e, exc_info=not isinstance(e, sqlite3.Error))
+                self.errors += 1
+                self._restore(pending)
+                return 0
+            flushed = sum(count for _, count in pending.values())
+            self.flushed += flushed
+            self.flushes += 1
+            self.last_flush_seconds = time.perf_counter() - started
+            logging.debug("Flushed %s ratings for %s recipes in %.4fs", flushed, len(pending), self.last_flush_seconds)
+            return flushed
+
+    def _restore(self, pending):
+        with self._lock:
+            for recipe_id, (total, count) in pending.items():
+                current_total, current_count = self._pending.get(recipe_id, (0.0, 0))
+                self._pending[recipe_id] = (current_total + total, current_count + count)
+                self._pending_count += count
+
+    def pending_for(self, recipe_id):
+        """(sum, count) of the not yet flushed ratings of one recipe."""
+        with self._lock:
+            return self._pending.get(recipe_id, (0.0, 0)) if self._pid == os.getpid() else (0.0, 0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": self._pending_count,
+                "pending_recipes": len(self._pending),
+                "accepted": self.accepted,
+                "flushed": self.flushed,
+                "flushes": self.flushes,
+                "errors": self.errors,
+                "last_flush_seconds": round(self.last_flush_seconds, 6),
+                "flush_interval": self.flush_interval
+            }
+
+
+rating_buffer = RatingBuffer()
+atexit.register(rating_buffer.flush)
+
+
+def record_rating(recipe_id, stars):
+    rating_buffer.add(recipe_id, stars)
+
+
+def live_rating(recipe_id, rating, rating_count):
+    """(rating, rating_count) with this process's unflushed ratings of the recipe folded in."""
+    total, count = rating_buffer.pending_for(recipe_id)
+    if not count:
+        return rating, rating_count
+    rating_count = rating_count or 0
+    return ((rating or 0.0) * rating_count + total) / (rating_count + count), rating_count + count
+
+
+def flush_ratings():
+    return rating_buffer.flush()
+
+
+def rating_stats():
+    return rating_buffer.stats()
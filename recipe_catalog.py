@@ -0,0 +1,225 @@
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import database
+
+CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "2"))
+
+
+class FrozenDict(dict):
+    """A dict that refuses in-place changes.
+
+    Every request thread shares the same catalog recipes, so a caller that
+    needs a changed recipe copies it first: dict(recipe) or {**recipe, ...}
+    give an ordinary dict. Being a real dict keeps it JSON-serializable.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("catalog recipes are read-only; copy with dict(recipe) first")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class _DerivedCache:
+    """Lazily built structures, each computed once from self._source()."""
+
+    __slots__ = ("_derived", "_lock", "_build_locks")
+
+    def __init__(self):
+        self._derived = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def derived(self, name, builder):
+        """Return builder(source), computed once per object and cached under name.
+
+        Builders should work from the source they are given. Each name has
+        its own build lock, so a builder that does reach another derived()
+        structure cannot deadlock on this object.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self._source())
+            return self._derived[name]
+
+
+class RatingTable(_DerivedCache):
+    """(rating, rating_count) per recipe id, as last read from the database.
+
+    Rating flushes only replace the snapshot's RatingTable, so structures
+    that depend on ratings (the rating-weighted sampler) are derived from
+    it, while everything built from the recipes survives the flush.
+    """
+
+    __slots__ = ("version", "_ratings")
+
+    def __init__(self, version, ratings):
+        super().__init__()
+        self.version = version
+        self._ratings = ratings
+
+    def _source(self):
+        return self._ratings
+
+    def get(self, recipe_id, default=(0.0, 0)):
+        return self._ratings.get(recipe_id, default)
+
+
+class CatalogSnapshot(_DerivedCache):
+    """Immutable view of the recipes table at one catalog version.
+
+    Recipes are FrozenDicts whose lists are tuples, so no request can change
+    what the others see. Structures derived from the recipes (indexes,
+    scoring tables) are built lazily through derived() and live exactly as
+    long as the snapshot, so they are rebuilt only when recipe content
+    changes. Ratings change far more often and live in self.ratings, which
+    the catalog swaps without replacing the snapshot; the rating fields of
+    the recipes themselves are as of the load.
+    """
+
+    __slots__ = ("version", "recipes", "by_id", "ratings")
+
+    def __init__(self, version, recipes):
+        super().__init__()
+        self.version = version
+        self.recipes = recipes
+        self.by_id = {recipe['id']: recipe for recipe in recipes}
+        self.ratings = RatingTable(1, {recipe['id']: (recipe.get('rating'), recipe.get('rating_count')) for recipe in recipes})
+
+    def _source(self):
+        return self.recipes
+
+
+class RecipeCatalog:
+    """Process-wide, pre-parsed copy of the recipes table.
+
+    PRAGMA data_version on a dedicated watch connection reports a commit
+    from any other connection. The catalog then compares the content
+    watermark in catalog_state: the table is reloaded only when recipe
+    content changed, and any other commit (rating flushes, similarity
+    rebuilds) just rereads the ratings. The version check itself runs at
+    most once every check_interval seconds, so the common request path does
+    no database I/O at all.
+    """
+
+    def __init__(self, check_interval=CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._data_version = None
+        self._content_version = None
+        self._watch_conn = None
+        self._watch_pid = None
+        self._next_check = 0.0
+
+    def _read_data_version(self):
+        if self._watch_conn is None or self._watch_pid != os.getpid():
+            self._watch_conn = sqlite3.connect(database.DATABASE_FILE, check_same_thread=False)
+            self._watch_pid = os.getpid()
+        return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self, force=False):
+        """Reload the recipes if the table changed since the last load."""
+        now = time.monotonic()
+        if not force and self._snapshot is not None and now < self._next_check:
+            return
+        with self._lock:
+            if not force and self._snapshot is not None and now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                data_version = self._read_data_version()
+            except sqlite3.Error as e:
+                logging.error("Recipe catalog version check failed: %s", e)
+                data_version = None
+            if not force and self._snapshot is not None and data_version == self._data_version:
+                return
+            content_version = None
+            if data_version is not None:
+                try:
+                    content_version = database.get_catalog_version(self._watch_conn)
+                except sqlite3.Error as e:
+                    logging.error("Recipe catalog watermark check failed: %s", e)
+            if force or self._snapshot is None or content_version is None or content_version != self._content_version:
+                self._load(data_version, content_version)
+            else:
+                self._reload_ratings(data_version)
+
+    def _load(self, data_version, content_version=None):
+        previous = self._snapshot
+        try:
+            recipes = tuple(_freeze(_compact(recipe)) for recipe in database.get_all_recipes())
+        except sqlite3.Error as e:
+            logging.error("Failed to load recipe catalog: %s", e)
+            recipes = previous.recipes if previous else ()
+        version = previous.version + 1 if previous else 1
+        self._snapshot = CatalogSnapshot(version, recipes)
+        self._data_version = data_version
+        self._content_version = content_version
+        logging.info("Recipe catalog v%s loaded with %s recipes", version, len(recipes))
+
+    def _reload_ratings(self, data_version):
+        snapshot = self._snapshot
+        try:
+            ratings = database.get_ratings()
+        except sqlite3.Error as e:
+            logging.error("Failed to reload recipe ratings: %s", e)
+            return
+        snapshot.ratings = RatingTable(snapshot.ratings.version + 1, ratings)
+        self._data_version = data_version
+        logging.debug("Recipe catalog v%s ratings reloaded", snapshot.version)
+
+    def snapshot(self):
+        self.refresh()
+        return self._snapshot
+
+    def get_recipes(self):
+        return self.snapshot().recipes
+
+    def get_recipe(self, recipe_id):
+        return self.snapshot().by_id.get(recipe_id)
+
+
+def _compact(recipe):
+    ingredients = recipe.get('ingredients')
+    if isinstance(ingredients, list):
+        recipe['ingredients'] = [sys.intern(ing) if isinstance(ing, str) else ing for ing in ingredients]
+    if isinstance(recipe.get('difficulty'), str):
+        recipe['difficulty'] = sys.intern(recipe['difficulty'])
+    return recipe
+
+
+def _freeze(value):
+    """value with every dict made a FrozenDict and every list a tuple, recursively."""
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+_catalog = RecipeCatalog()
+
+
+def get_catalog():
+    return _catalog
+
+
+def get_recipes():
+    """Return the current tuple of recipes without touching the database."""
+    return _catalog.get_recipes()
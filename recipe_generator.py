@@ -1,28 +1,48 @@
+import os
 import random
 import logging
-from database import get_all_recipes, get_flavor_pairs
+from database import get_flavor_pairs, find_recipes_with_ingredients, get_random_recipe
+from ingredient_index import IngredientIndex
+from recipe_catalog import get_catalog, get_recipes
 
-logging.basicConfig(level=logging.DEBUG)
+# Answer ingredient matches and random picks with indexed SQL queries instead of the in-memory catalog
+RECIPE_SQL_MATCHING = os.getenv("RECIPE_SQL_MATCHING", "0").lower() in ("1", "true", "yes")
+
+def _format_predefined(recipe, language):
+    title = recipe['title_es'] if language == 'spanish' else recipe['title_en']
+    steps = recipe['steps_es'] if language == 'spanish' else recipe['steps_en']
+    return {
+        "id": recipe['id'],
+        "title": title,
+        "ingredients": [(ing, "100g") for ing in recipe['ingredients']],
+        "steps": steps,
+        "nutrition": recipe['nutrition'],
+        "cooking_time": recipe['cooking_time'],
+        "difficulty": recipe['difficulty'],
+        "equipment": recipe.get('equipment', ["skillet"]),
+        "servings": recipe.get('servings', 2),
+        "tips": recipe.get('tips', "Season to taste!")
+    }
+
+def get_ingredient_index():
+    return get_catalog().snapshot().derived('ingredient_index', IngredientIndex)
 
 def match_predefined_recipe(ingredients, language):
-    recipes = get_all_recipes()
-    for recipe in recipes:
-        if set(ingredients).issubset(set(recipe['ingredients'])):
-            title = recipe['title_es'] if language == 'spanish' else recipe['title_en']
-            steps = recipe['steps_es'] if language == 'spanish' else recipe['steps_en']
-            return {
-                "id": recipe['id'],
-                "title": title,
-                "ingredients": [(ing, "100g") for ing in recipe['ingredients']],
-                "steps": steps,
-                "nutrition": recipe['nutrition'],
-                "cooking_time": recipe['cooking_time'],
-                "difficulty": recipe['difficulty'],
-                "equipment": recipe.get('equipment', ["skillet"]),
-                "servings": recipe.get('servings', 2),
-                "tips": recipe.get('tips', "Season to taste!")
-            }
-    return None
+    if RECIPE_SQL_MATCHING:
+        matches = find_recipes_with_ingredients(ingredients, limit=1)
+        return _format_predefined(matches[0], language) if matches else None
+    index = get_ingredient_index()
+    position = index.first_match(ingredients)
+    if position is None:
+        return None
+    return _format_predefined(index.recipes[position], language)
+
+def match_predefined_recipes(ingredients, language, limit=5):
+    """Return up to limit predefined recipes containing all ingredients, best match first."""
+    if RECIPE_SQL_MATCHING:
+        return [_format_predefined(recipe, language) for recipe in find_recipes_with_ingredients(ingredients, limit, ranked=True)]
+    index = get_ingredient_index()
+    return [_format_predefined(index.recipes[position], language) for position in index.top_k(ingredients, limit)]
 
 def generate_dynamic_recipe(ingredients, preferences):
     language = preferences.get('language', 'english').lower()
@@ -161,15 +181,20 @@ def generate_dynamic_recipe(ingredients, preferences):
         "tips": "Adjust cooking times based on your stove!"
     }
 
-def generate_random_recipe(language):
-    recipes = get_all_recipes()
-    if not recipes:
-        logging.error("No recipes found in database")
-        return {"error": "No recipes available in the database"}
-    
-    logging.debug(f"Retrieved {len(recipes)} recipes from database")
-    random_recipe = random.choice(recipes)
-    logging.debug(f"Selected random recipe: {random_recipe}")
+def generate_random_recipe(language, rng=random):
+    if RECIPE_SQL_MATCHING:
+        random_recipe = get_random_recipe(rng)
+        if random_recipe is None:
+            logging.error("No recipes found in database")
+            return {"error": "No recipes available in the database"}
+    else:
+        recipes = get_recipes()
+        if not recipes:
+            logging.error("No recipes found in database")
+            return {"error": "No recipes available in the database"}
+        logging.debug("Retrieved %s recipes from database", len(recipes))
+        random_recipe = rng.choice(recipes)
+    logging.debug("Selected random recipe: %s", random_recipe)
     
     title = random_recipe['title_es'] if language == 'spanish' else random_recipe['title_en']
     steps = random_recipe['steps_es'] if language == 'spanish' else random_recipe['steps_en']
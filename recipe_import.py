@@ -0,0 +1,238 @@
+"""Bulk recipe import.
+
+    python recipe_import.py recipes.ndjson more.csv recipes_data [--db recipes.db] [--batch-size 5000]
+
+Sources are JSON files (a list, or {"recipes": [...]}), NDJSON/JSONL files
+with one recipe per line, CSV files with one column per recipe field, or
+the name recipes_data for the built-in recipes_data.RANDOM_RECIPES.
+Records are validated and deduplicated on normalized title + ingredients,
+against each other and against the recipes already in the database, then
+loaded with executemany in a single transaction.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+import database
+from recipes_data import RANDOM_RECIPES
+
+BUILTIN_SOURCE = 'recipes_data'
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+MAX_REPORTED_ERRORS = 20
+
+LIST_FIELDS = ('steps_en', 'steps_es', 'ingredients')
+
+
+class RecipeValidationError(ValueError):
+    """A record cannot be imported as a recipe."""
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('recipes')
+    if not isinstance(data, list):
+        raise RecipeValidationError(f"{path}: expected a list of recipes or {{\"recipes\": [...]}}")
+    yield from data
+
+
+def read_ndjson(path):
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # Let validation count and report it like any other bad record
+                yield RecipeValidationError(f"{path} line {number}: invalid JSON ({e.msg})")
+
+
+def read_csv(path):
+    """CSV rows with recipe fields as columns; list fields are JSON arrays or |-separated, nutrition is JSON."""
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            record = {name: value for name, value in row.items() if value not in (None, '')}
+            for name in LIST_FIELDS:
+                value = record.get(name)
+                if value is not None:
+                    record[name] = _json_or(value, lambda v: [item.strip() for item in v.split('|')])
+            if 'nutrition' in record:
+                record['nutrition'] = _json_or(record['nutrition'], lambda v: v)
+            yield record
+
+
+def _json_or(value, fallback):
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return fallback(value)
+
+
+READERS = {'.json': read_json, '.ndjson': read_ndjson, '.jsonl': read_ndjson, '.csv': read_csv}
+
+
+def iter_source(source):
+    """Records from one source: a file path, or BUILTIN_SOURCE."""
+    if source == BUILTIN_SOURCE:
+        return iter(RANDOM_RECIPES)
+    reader = READERS.get(os.path.splitext(source)[1].lower())
+    if reader is None:
+        raise RecipeValidationError(f"{source}: unsupported file type (use {', '.join(READERS)})")
+    return reader(source)
+
+
+def _string_list(record, name, lowercase=False):
+    value = record.get(name)
+    if not isinstance(value, list) or not value or not all(isinstance(item, str) for item in value):
+        raise RecipeValidationError(f"{name} must be a non-empty list of strings")
+    items = [item.strip().lower() if lowercase else item.strip() for item in value]
+    # Drop blanks and repeats, keeping the original order
+    return list(dict.fromkeys(item for item in items if item))
+
+
+def _number(record, name, default, kind):
+    value = record.get(name, default)
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise RecipeValidationError(f"{name} must be a number")
+    if isinstance(value, bool) or number < 0:
+        raise RecipeValidationError(f"{name} must be a non-negative number")
+    return number
+
+
+def validate_recipe(record):
+    """Return the cleaned recipe for one input record, or raise RecipeValidationError."""
+    if isinstance(record, RecipeValidationError):
+        raise record
+    if not isinstance(record, dict):
+        raise RecipeValidationError("recipe must be an object")
+    title_en = record.get('title_en')
+    if not isinstance(title_en, str) or not title_en.strip():
+        raise RecipeValidationError("title_en is required")
+    title_es = record.get('title_es') or title_en
+    if not isinstance(title_es, str):
+        raise RecipeValidationError("title_es must be a string")
+    ingredients = _string_list(record, 'ingredients', lowercase=True)
+    if not ingredients:
+        raise RecipeValidationError("ingredients must name at least one ingredient")
+    steps_en = _string_list(record, 'steps_en')
+    steps_es = _string_list(record, 'steps_es') if record.get('steps_es') else steps_en
+    nutrition = record.get('nutrition', {})
+    if not isinstance(nutrition, dict):
+        raise RecipeValidationError("nutrition must be an object")
+    difficulty = record.get('difficulty', 'medium')
+    if not isinstance(difficulty, str) or not difficulty.strip():
+        raise RecipeValidationError("difficulty must be a string")
+    return {
+        'title_en': title_en.strip(),
+        'title_es': title_es.strip(),
+        'steps_en': steps_en,
+        'steps_es': steps_es,
+        'ingredients': ingredients,
+        'nutrition': nutrition,
+        'cooking_time': _number(record, 'cooking_time', 30, int),
+        'difficulty': difficulty.strip().lower(),
+        'rating': _number(record, 'rating', 0.0, float),
+        'rating_count': _number(record, 'rating_count', 0, int)
+    }
+
+
+def dedupe_key(title, ingredients):
+    return ' '.join(title.lower().split()), tuple(sorted({ing.strip().lower() for ing in ingredients if isinstance(ing, str)}))
+
+
+def to_row(recipe):
+    return tuple(
+        json.dumps(recipe[name]) if name in LIST_FIELDS or name == 'nutrition' else recipe[name]
+        for name in database.RECIPE_COLUMNS
+    )
+
+
+def import_recipes(records, batch_size=IMPORT_BATCH_SIZE, defer_indexes=True):
+    """Validate, dedupe and insert records in one transaction; returns a report dict.
+
+    Invalid records are counted and the first MAX_REPORTED_ERRORS reasons
+    are kept in the report; they never abort the import.
+    """
+    report = {'read': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+    started = time.perf_counter()
+
+    def batches(seen):
+        batch = []
+        for record in records:
+            report['read'] += 1
+            try:
+                recipe = validate_recipe(record)
+            except RecipeValidationError as e:
+                report['invalid'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append(f"record {report['read']}: {str(e)}")
+                continue
+            key = dedupe_key(recipe['title_en'], recipe['ingredients'])
+            if key in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(key)
+            batch.append(to_row(recipe))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with database.get_db_connection() as conn:
+        # Take the write lock before reading existing keys so concurrent imports cannot both insert a recipe
+        conn.execute("BEGIN IMMEDIATE")
+        seen = {
+            dedupe_key(title, _json_or(ingredients, lambda v: []) or [])
+            for title, ingredients in conn.execute("SELECT title_en, ingredients FROM recipes")
+        }
+        report['imported'] = database.bulk_insert_recipes(conn, batches(seen), defer_indexes)
+
+    elapsed = time.perf_counter() - started
+    report['seconds'] = round(elapsed, 3)
+    report['rows_per_sec'] = round(report['imported'] / elapsed) if elapsed else 0
+    logging.info(
+        "Imported %s of %s recipes (%s duplicates, %s invalid) in %.2fs, %s rows/sec",
+        report['imported'], report['read'], report['duplicates'], report['invalid'], elapsed, report['rows_per_sec']
+    )
+    return report
+
+
+def import_sources(sources, batch_size=IMPORT_BATCH_SIZE, defer_indexes=True):
+    """import_recipes over every record of every source, in order, as one import."""
+    def records():
+        for source in sources:
+            yield from iter_source(source)
+    return import_recipes(records(), batch_size, defer_indexes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import recipes into the recipe database.")
+    parser.add_argument('sources', nargs='+', help=f"JSON, NDJSON/JSONL or CSV files, or {BUILTIN_SOURCE}")
+    parser.add_argument('--db', default=database.DATABASE_FILE, help="database file (default: %(default)s)")
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="rows per executemany call")
+    parser.add_argument('--keep-indexes', action='store_true', help="maintain indexes and triggers row by row instead of rebuilding them after the load")
+    args = parser.parse_args(argv)
+
+    database.DATABASE_FILE = args.db
+    database.init_db()
+    try:
+        report = import_sources(args.sources, args.batch_size, not args.keep_indexes)
+    except (OSError, RecipeValidationError) as e:
+        print(f"Import failed: {str(e)}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
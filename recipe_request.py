@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+
+from flask import g, request
+
+# Preferences that change the generated recipe; anything else is ignored for caching.
+TEXT_PREFERENCES = ('language', 'diet', 'time')
+LABEL_PREFERENCES = ('style', 'category')
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "20"))
+MAX_RESULTS = int(os.getenv("MAX_RESULTS", "20"))
+MAX_RATINGS = int(os.getenv("MAX_RATINGS", "100"))
+MIN_STARS = 1
+MAX_STARS = 5
+
+RecipeRequest = namedtuple('RecipeRequest', ['ingredients', 'preferences', 'key', 'seed', 'count'])
+
+
+class RecipeRequestError(ValueError):
+    """The request body cannot be turned into a recipe request."""
+
+
+def normalize_ingredients(ingredients):
+    """Lowercase, trim and dedupe ingredient names, dropping blanks.
+
+    Input order is kept: the first ingredient is the main one of a dynamic
+    recipe, so order is part of the request (and of its cache key).
+    """
+    if not isinstance(ingredients, list):
+        raise RecipeRequestError("Ingredients must be a list")
+    if not all(isinstance(ing, str) for ing in ingredients):
+        raise RecipeRequestError("Ingredients must be a list of strings")
+    return list(dict.fromkeys(ing for ing in (ing.strip().lower() for ing in ingredients) if ing))
+
+
+def normalize_preferences(preferences):
+    if not isinstance(preferences, dict):
+        raise RecipeRequestError("Preferences must be a dict")
+    normalized = {'isRandom': bool(preferences.get('isRandom', False))}
+    for name in TEXT_PREFERENCES:
+        normalized[name] = str(preferences.get(name) or '').strip().lower()
+    for name in LABEL_PREFERENCES:
+        normalized[name] = str(preferences.get(name) or '').strip()
+    normalized['language'] = normalized['language'] or 'english'
+    return normalized
+
+
+def normalize_count(count):
+    if isinstance(count, bool) or not isinstance(count, int) or not 1 <= count <= MAX_RESULTS:
+        raise RecipeRequestError(f"Count must be an integer between 1 and {MAX_RESULTS}")
+    return count
+
+
+def fingerprint(ingredients, preferences, count=1):
+    canonical = json.dumps([ingredients, preferences, count], sort_keys=True, separators=(',', ':'))
+    return 'recipe:' + hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def normalize_seed(seed, key):
+    """None/false for unseeded requests; true derives a seed from the request fingerprint.
+
+    Integer strings (a GET ?seed=7) become ints, so they seed exactly like the JSON number.
+    """
+    if seed is None or seed is False:
+        return None
+    if seed is True:
+        return key
+    if isinstance(seed, str) and re.fullmatch(r'\s*-?\d+\s*', seed):
+        return int(seed)
+    if isinstance(seed, (int, str)):
+        return seed
+    raise RecipeRequestError("Seed must be an integer, a string or true")
+
+
+def canonicalize_request(data):
+    """Validate a /generate_recipe payload and return its canonical RecipeRequest."""
+    if data is None:
+        raise RecipeRequestError("Invalid or missing JSON payload—check your request format!")
+    if not isinstance(data, dict):
+        raise RecipeRequestError("Payload must be a JSON object—not an array or string!")
+    ingredients = normalize_ingredients(data.get('ingredients', []))
+    preferences = normalize_preferences(data.get('preferences', {}))
+    count = normalize_count(data.get('count', 1))
+    key = fingerprint(ingredients, preferences, count)
+    return RecipeRequest(ingredients, preferences, key, normalize_seed(data.get('seed'), key), count)
+
+
+def canonicalize_batch(data):
+    """Validate a /generate_recipes payload.
+
+    Returns one RecipeRequest per item, or the RecipeRequestError describing
+    why that item was rejected, so one bad item does not fail the batch.
+    """
+    if data is None:
+        raise RecipeRequestError("Invalid or missing JSON payload—check your request format!")
+    if not isinstance(data, dict) or not isinstance(data.get('requests'), list):
+        raise RecipeRequestError("Payload must be a JSON object with a 'requests' list")
+    items = data['requests']
+    if not items:
+        raise RecipeRequestError("Send at least one request")
+    if len(items) > MAX_BATCH_SIZE:
+        raise RecipeRequestError(f"Maximum of {MAX_BATCH_SIZE} requests per batch")
+    results = []
+    for item in items:
+        try:
+            results.append(canonicalize_request(item))
+        except RecipeRequestError as e:
+            results.append(e)
+    return results
+
+
+def canonicalize_ratings(data):
+    """Validate a /rate payload, one {"recipe_id", "rating"} object or {"ratings": [...]}, into (recipe_id, stars) pairs."""
+    if not isinstance(data, dict):
+        raise RecipeRequestError("Payload must be a JSON object—not an array or string!")
+    items = data['ratings'] if 'ratings' in data else [data]
+    if not isinstance(items, list) or not items:
+        raise RecipeRequestError("ratings must be a non-empty list")
+    if len(items) > MAX_RATINGS:
+        raise RecipeRequestError(f"Maximum of {MAX_RATINGS} ratings per request")
+    ratings = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise RecipeRequestError("Each rating must be an object with recipe_id and rating")
+        recipe_id, stars = item.get('recipe_id'), item.get('rating')
+        if isinstance(recipe_id, bool) or not isinstance(recipe_id, int):
+            raise RecipeRequestError("recipe_id must be an integer")
+        if isinstance(stars, bool) or not isinstance(stars, (int, float)) or not MIN_STARS <= stars <= MAX_STARS:
+            raise RecipeRequestError(f"rating must be a number from {MIN_STARS} to {MAX_STARS}")
+        ratings.append((recipe_id, float(stars)))
+    return ratings
+
+
+def payload_from_args(args):
+    """Build a /generate_recipe payload from GET query parameters."""
+    preferences = {name: args[name] for name in TEXT_PREFERENCES + LABEL_PREFERENCES if name in args}
+    preferences['isRandom'] = args.get('isRandom', '').lower() in ('1', 'true', 'yes')
+    seed = args.get('seed')
+    count = args.get('count', '1')
+    return {
+        'ingredients': args.get('ingredients', '').split(','),
+        'preferences': preferences,
+        'seed': True if seed in ('auto', 'true') else seed,
+        'count': int(count) if count.isdigit() else count
+    }
+
+
+def get_recipe_request():
+    """Parse and canonicalize the current request once, caching the result on flask.g."""
+    if '_recipe_request' not in g:
+        try:
+            data = payload_from_args(request.args) if request.method == 'GET' else request.get_json(silent=True)
+            g._recipe_request = canonicalize_request(data)
+        except RecipeRequestError as e:
+            g._recipe_request = e
+    if isinstance(g._recipe_request, RecipeRequestError):
+        raise g._recipe_request
+    return g._recipe_request
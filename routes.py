@@ -2,6 +2,9 @@ from flask import request, jsonify
 from config import app, limiter, cache
 from services.recipe_service import generate_recipe_service
 from services.ingredient_service import get_ingredients_service
+from http_cache import PrecomputedJSON
+
+INGREDIENTS_RESPONSE = PrecomputedJSON(get_ingredients_service())
 
 @app.route("/", methods=["GET"])
 def home():
@@ -19,7 +22,7 @@ def home():
 def get_ingredients():
     if request.method == "OPTIONS":
         return "", 200
-    return jsonify(get_ingredients_service())
+    return INGREDIENTS_RESPONSE.response()
 
 @app.route("/generate_recipe", methods=["POST", "OPTIONS"])
 @limiter.limit("10 per minute")
@@ -0,0 +1,53 @@
+class AliasSampler:
+    """Weighted random choice over a fixed list in O(1) per draw (Vose's alias method).
+
+    Building the table is O(n); it is meant to be built once per catalog
+    snapshot and shared. Each draw consumes exactly one rng.random(), so a
+    seeded generator gives reproducible picks.
+    """
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        n = len(self.items)
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            return
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding error
+        for i in small + large:
+            self._prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def _index(self, rng):
+        x = rng.random() * len(self.items)
+        i = int(x)
+        return i if x - i < self._prob[i] else self._alias[i]
+
+    def sample(self, rng):
+        return self.items[self._index(rng)]
+
+    def sample_distinct(self, rng, k):
+        """Up to k different items, drawn by weight; gives up on repeats after a bounded number of draws."""
+        if k >= len(self.items):
+            picked = list(self.items)
+            rng.shuffle(picked)
+            return picked
+        seen = {}
+        for _ in range(k * 8):
+            i = self._index(rng)
+            seen.setdefault(i, None)
+            if len(seen) == k:
+                break
+        return [self.items[i] for i in seen]
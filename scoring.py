@@ -0,0 +1,81 @@
+from functools import lru_cache
+
+import numpy as np
+from fuzzywuzzy import fuzz
+
+PAIR_BONUS = 0.2
+
+
+def is_valid_random_recipe(recipe):
+    return isinstance(recipe, dict) and 'ingredients' in recipe and 'title_en' in recipe
+
+
+class ScoringEngine:
+    """Vectorized equivalent of app.score_recipe over a fixed list of recipes.
+
+    The distinct recipe ingredients (lower-cased) form a vocabulary that each
+    input ingredient is fuzzed against once; the per-recipe best match is then
+    a gather + max over a padded recipe x vocabulary-id matrix. Scores are
+    accumulated in the same order as score_recipe, so they are bit-for-bit
+    identical to it.
+    """
+
+    def __init__(self, recipes, pairs, ratio_cache_size=4096):
+        self.recipes = list(recipes)
+        vocab_ids = {}
+        rows = []
+        names_per_recipe = []
+        for recipe in self.recipes:
+            names = _ingredient_names(recipe)
+            names_per_recipe.append(names)
+            rows.append(sorted({vocab_ids.setdefault(name.lower(), len(vocab_ids)) for name in names if isinstance(name, str)}))
+        self.vocabulary = list(vocab_ids)
+        # Empty slots point one past the vocabulary, where every ratio array has a trailing 0.
+        width = max([len(row) for row in rows] + [1])
+        self._members = np.full((len(rows), width), len(self.vocabulary), dtype=np.int32)
+        for i, row in enumerate(rows):
+            self._members[i, :len(row)] = row
+        # For each pairable input, one 0/PAIR_BONUS vector per paired ingredient, in pair order.
+        self._pair_bonuses = {
+            ing: [np.array([PAIR_BONUS if p in names else 0.0 for names in names_per_recipe]) for p in paired]
+            for ing, paired in pairs.items()
+        }
+        self._ratios = lru_cache(maxsize=ratio_cache_size)(self._compute_ratios)
+
+    def _compute_ratios(self, input_ing):
+        lowered = input_ing.lower()
+        ratios = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        ratios[:-1] = [fuzz.ratio(lowered, term) for term in self.vocabulary]
+        return ratios
+
+    def scores(self, ingredients):
+        """Return a float array with score_recipe(recipe, ingredients) for every recipe."""
+        scores = np.zeros(len(self.recipes))
+        if not ingredients or not self.recipes:
+            return scores
+        for input_ing in set(ingredients):
+            scores += self._ratios(input_ing)[self._members].max(axis=1) / 100
+            for bonus in self._pair_bonuses.get(input_ing, ()):
+                scores += bonus
+        return scores
+
+    def top(self, ingredients, k=5):
+        """The k best scoring recipes, in the order sorted(..., reverse=True)[:k] would give."""
+        n = len(self.recipes)
+        if n == 0 or k <= 0:
+            return []
+        scores = self.scores(ingredients)
+        if n > k:
+            kth = np.partition(scores, n - k)[n - k]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(n)
+        best = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [self.recipes[i] for i in best]
+
+
+def _ingredient_names(recipe):
+    ingredients = recipe.get('ingredients') or []
+    if ingredients and isinstance(ingredients[0], (tuple, list)):
+        return {item[0] if isinstance(item, (tuple, list)) else item for item in ingredients}
+    return set(ingredients)
@@ -0,0 +1,135 @@
+"""Process-pool offload for isRandom scoring.
+
+Fuzzy scoring is CPU-bound and serialized by the GIL on the request threads.
+With SCORING_PROCESSES > 0 it runs in a pre-warmed pool instead: each worker
+loads its own recipe catalog and ScoringEngine at startup, so a request only
+ships its ingredients in and recipe ids out. Requests that miss the
+SCORING_DEADLINE get None back and fall back to a cheap random pick.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from recipe_catalog import get_catalog
+from scoring import ScoringEngine, is_valid_random_recipe
+
+SCORING_PROCESSES = int(os.getenv("SCORING_PROCESSES", "0"))
+SCORING_DEADLINE = float(os.getenv("SCORING_DEADLINE", "0.25"))
+
+_worker_pairs = {}
+
+
+def _init_worker(pairs):
+    global _worker_pairs
+    _worker_pairs = pairs
+    _worker_engine()
+
+
+def _worker_engine():
+    return get_catalog().snapshot().derived(
+        'scoring_engine',
+        lambda recipes: ScoringEngine([r for r in recipes if is_valid_random_recipe(r)], _worker_pairs)
+    )
+
+
+def _rank(ingredients, k):
+    return [recipe['id'] for recipe in _worker_engine().top(ingredients, k)]
+
+
+def _ready():
+    return os.getpid()
+
+
+class ScoringPool:
+    """Pre-warmed process pool that ranks recipes under a per-request deadline.
+
+    Workers are spawned rather than forked, so they never inherit the
+    parent's request threads or SQLite connections. The pool is restarted
+    after a fork of the parent or after a worker dies.
+
+    A missed deadline does not stop the task: once a worker has started
+    it, future.cancel() is a no-op and the worker stays busy until the
+    ranking finishes. Such overdue tasks are counted. While every worker
+    is tied up with one, rank() returns None at once instead of queueing
+    more work behind them, so timeouts shed load rather than pile up.
+    """
+
+    def __init__(self, processes, pairs, deadline=SCORING_DEADLINE):
+        self.processes = processes
+        self.pairs = pairs
+        self.deadline = deadline
+        self.timeouts = 0
+        self.failures = 0
+        self.shed = 0
+        self._overdue = 0
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.pairs,)
+                )
+                self._pid = os.getpid()
+                self._overdue = 0
+                # One round trip per worker makes every process start and build its engine now
+                for future in [self._executor.submit(_ready) for _ in range(self.processes)]:
+                    future.result()
+                logging.info("Scoring pool started with %s processes", self.processes)
+            return self._executor
+
+    def start(self):
+        self._pool()
+        return self
+
+    def rank(self, ingredients, k=5):
+        """Ids of the k best scoring recipes, or None if the deadline passed, the pool is saturated or failed."""
+        with self._lock:
+            saturated = self._overdue >= self.processes
+            if saturated:
+                self.shed += 1
+        if saturated:
+            return None
+        try:
+            future = self._pool().submit(_rank, list(ingredients), k)
+        except (BrokenProcessPool, RuntimeError) as e:
+            return self._broken(e)
+        try:
+            return future.result(timeout=self.deadline)
+        except TimeoutError:
+            overdue = not future.cancel()
+            with self._lock:
+                self.timeouts += 1
+                if overdue:
+                    self._overdue += 1
+            if overdue:
+                future.add_done_callback(self._overdue_done)
+            logging.warning("Scoring missed its %ss deadline for %s ingredients", self.deadline, len(ingredients))
+            return None
+        except BrokenProcessPool as e:
+            return self._broken(e)
+
+    def _overdue_done(self, future):
+        with self._lock:
+            self._overdue = max(0, self._overdue - 1)
+
+    def _broken(self, error):
+        logging.error("Scoring pool failed; restarting on next request: %s", error)
+        with self._lock:
+            self.failures += 1
+            self._executor = None
+        return None
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
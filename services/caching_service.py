@@ -1,21 +1,241 @@
-from config import cache
+import json
 import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_BACKEND = os.getenv("RECIPE_CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("RECIPE_CACHE_PATH", "recipe_cache.db")
+CACHE_MAX_ENTRIES = int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", "2048"))
+CACHE_MAX_BYTES = int(os.getenv("RECIPE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_TTL = int(os.getenv("RECIPE_CACHE_TTL", "3600"))
+
+
+class MemoryCacheBackend:
+    """In-process LRU store bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, blob = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return blob
+
+    def set(self, key, blob, ttl):
+        """Store blob and return the number of entries evicted to make room."""
+        size = len(key) + len(blob)
+        if size > self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and (len(self._entries) >= self.max_entries or self._bytes + size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            self._entries[key] = (time.time() + ttl, blob)
+            self._bytes += size
+        return evicted
+
+    def _remove(self, key):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(key) + len(blob)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def usage(self):
+        return len(self._entries), self._bytes
+
+
+class SQLiteCacheBackend:
+    """File-backed LRU store shared by every worker process on the box.
+
+    Access times are only rewritten when they are more than a second stale,
+    so hot keys do not turn every hit into a write.
+    """
+
+    def __init__(self, path, max_entries, max_bytes):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        blob, expires_at, accessed_at = row
+        if expires_at <= now:
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return None
+        if now - accessed_at > 1.0:
+            with conn:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return blob
+
+    def set(self, key, blob, ttl):
+        """Store blob and return the number of entries evicted to make room."""
+        size = len(key) + len(blob)
+        if size > self.max_bytes:
+            return 0
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, size, now + ttl, now)
+            )
+            evicted = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+            if count <= self.max_entries and total <= self.max_bytes:
+                return 0
+            victims = []
+            for victim, victim_size in conn.execute("SELECT key, size FROM cache WHERE key != ? ORDER BY accessed_at", (key,)):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                victims.append((victim,))
+                count -= 1
+                total -= victim_size
+            conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+        return evicted + len(victims)
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def usage(self):
+        return self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+
+
+class RecipeCache:
+    """JSON value cache with TTL and hit/miss/eviction counters over a pluggable backend."""
+
+    def __init__(self, backend, default_ttl=CACHE_TTL):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        # Request threads update the counters concurrently and += is not atomic
+        self._lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def get(self, key):
+        try:
+            blob = self.backend.get(key)
+        except sqlite3.Error as e:
+            logging.error("Cache read failed for key %s: %s", key, e)
+            self._count('errors')
+            blob = None
+        if blob is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(blob)
+
+    def set(self, key, value, timeout=None):
+        blob = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        try:
+            self._count('evictions', self.backend.set(key, blob, timeout or self.default_ttl))
+        except sqlite3.Error as e:
+            logging.error("Cache write failed for key %s: %s", key, e)
+            self._count('errors')
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        entries, size = self.backend.usage()
+        with self._lock:
+            hits, misses, evictions, errors = self.hits, self.misses, self.evictions, self.errors
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": evictions,
+            "errors": errors,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.backend.max_entries,
+            "max_bytes": self.backend.max_bytes
+        }
+
+
+def create_backend(name=CACHE_BACKEND):
+    if name == "sqlite":
+        return SQLiteCacheBackend(CACHE_PATH, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+    if name != "memory":
+        logging.warning("Unknown cache backend %r; using memory", name)
+    return MemoryCacheBackend(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+recipe_cache = RecipeCache(create_backend())
 
 def get_cached_recipe(key):
     """Retrieve a cached recipe if available."""
-    cached_data = cache.get(key)
-    if cached_data:
-        logging.debug(f"Cache hit for key: {key}")
+    cached_data = recipe_cache.get(key)
+    if cached_data is not None:
+        logging.debug("Cache hit for key: %s", key)
     else:
-        logging.debug(f"Cache miss for key: {key}")
+        logging.debug("Cache miss for key: %s", key)
     return cached_data
 
-def cache_recipe(key, data, timeout=3600):
+def cache_recipe(key, data, timeout=None):
     """Store recipe data in cache with a timeout."""
-    cache.set(key, data, timeout=timeout)
-    logging.debug(f"Cached recipe with key: {key}")
+    recipe_cache.set(key, data, timeout)
+    logging.debug("Cached recipe with key: %s", key)
 
 def clear_cache():
     """Clear all cached recipes."""
-    cache.clear()
-    logging.info("Cache cleared successfully")
\ No newline at end of file
+    recipe_cache.clear()
+    logging.info("Cache cleared successfully")
+
+def cache_stats():
+    """Hit/miss/eviction counters and current size of the recipe cache."""
+    return recipe_cache.stats()
@@ -0,0 +1,272 @@
+"""Precomputed "more like this" neighbors for every recipe.
+
+    python similarity.py [--k 10] [--force]
+
+Two recipes are similar when their ingredient sets overlap (Jaccard) and,
+to a lesser degree, when one uses ingredients that pair well with the
+other's (FLAVOR_PAIRS / INGREDIENT_PAIRS). Pairing alone never makes two
+recipes similar: they must share at least one ingredient. Small catalogs are compared
+exhaustively with numpy; large ones only compare the candidate pairs that
+MinHash/LSH puts in a common bucket. The top-K neighbors of each recipe
+are written to recipe_similar, so serving them is one primary-key lookup.
+
+The background refresher runs in one process per database: each process
+tries a non-blocking lock on <database>.similarity.lock, and only the
+holder rebuilds, so gunicorn workers do not all recompute and rewrite
+the same index.
+"""
+import argparse
+import hashlib
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+import database
+from pairings import FLAVOR_PAIRS, INGREDIENT_PAIRS
+from recipe_catalog import get_catalog
+
+SIMILAR_K = int(os.getenv("SIMILAR_K", "10"))
+SIMILARITY_REFRESH_INTERVAL = float(os.getenv("SIMILARITY_REFRESH_INTERVAL", "3600"))
+# Catalogs up to this size are compared all-pairs; above it LSH picks the candidates
+EXACT_LIMIT = int(os.getenv("SIMILARITY_EXACT_LIMIT", "5000"))
+NUM_PERM = 64
+BANDS = 16
+MAX_BUCKET = 200
+PAIR_BOOST = 0.05
+MAX_PAIR_HITS = 5
+
+_MERSENNE = (1 << 31) - 1
+
+
+def merge_pairs(*pair_maps):
+    """One symmetric ingredient -> partners map from any number of pairing dicts."""
+    merged = {}
+    for pairs in pair_maps:
+        for ing, partners in pairs.items():
+            for partner in partners:
+                if partner != ing:
+                    merged.setdefault(ing, set()).add(partner)
+                    merged.setdefault(partner, set()).add(ing)
+    return merged
+
+
+def ingredient_sets(recipes):
+    return [frozenset(ing.lower() for ing in recipe.get('ingredients') or [] if isinstance(ing, str)) for recipe in recipes]
+
+
+def pair_score(a, b, partners_of_a):
+    """Jaccard similarity of two ingredient sets plus a capped boost for flavor pairs between them."""
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    if not inter:
+        return 0.0
+    return inter / (len(a) + len(b) - inter) + PAIR_BOOST * min(len(partners_of_a & b), MAX_PAIR_HITS)
+
+
+def _partners(ingredients, pairs):
+    partners = set()
+    for ing in ingredients:
+        partners.update(pairs.get(ing, ()))
+    return frozenset(partners - ingredients)
+
+
+def _stable_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def minhash_signatures(sets, num_perm=NUM_PERM, seed=1):
+    """num_perm MinHash values per set, from universal hashes (a * h + b) mod 2^31 - 1."""
+    vocab = {ing: i for i, ing in enumerate(sorted(set().union(*sets)))}
+    token_hashes = np.array([_stable_hash(ing) % _MERSENNE for ing in vocab], dtype=np.uint64)
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MERSENNE, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE, num_perm, dtype=np.uint64)
+    # h < 2^31 and a < 2^31, so a * h + b fits in uint64
+    hashed = (np.outer(token_hashes, a) + b) % _MERSENNE
+    signatures = np.full((len(sets), num_perm), _MERSENNE, dtype=np.uint64)
+    for i, ingredients in enumerate(sets):
+        if ingredients:
+            signatures[i] = hashed[[vocab[ing] for ing in ingredients]].min(axis=0)
+    return signatures
+
+
+def lsh_candidates(signatures, bands=BANDS, max_bucket=MAX_BUCKET):
+    """For each row, the other rows sharing at least one LSH band bucket with it."""
+    rows_per_band = signatures.shape[1] // bands
+    candidates = [set() for _ in range(len(signatures))]
+    for band in range(bands):
+        keys = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        _, bucket_of = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(bucket_of.ravel(), kind='stable')
+        bounds = np.flatnonzero(np.diff(bucket_of.ravel()[order])) + 1
+        for bucket in np.split(order, bounds):
+            if len(bucket) < 2:
+                continue
+            # Huge buckets are the handful of ultra-common sets; they add cost, not useful neighbors
+            members = bucket[:max_bucket].tolist()
+            for i in members:
+                candidates[i].update(members)
+    for i, found in enumerate(candidates):
+        found.discard(i)
+    return candidates
+
+
+def _top(scores, ids, k):
+    best = heapq.nsmallest(k, ((-score, similar_id) for similar_id, score in zip(ids, scores) if score > 0))
+    return [(similar_id, -neg_score) for neg_score, similar_id in best]
+
+
+def _exact_neighbors(sets, partners, ids, k):
+    """All-pairs scores via posting lists: one bincount per recipe instead of n set intersections."""
+    n = len(sets)
+    postings = {}
+    for i, ingredients in enumerate(sets):
+        for ing in ingredients:
+            postings.setdefault(ing, []).append(i)
+    postings = {ing: np.array(rows, dtype=np.int64) for ing, rows in postings.items()}
+    sizes = np.array([len(ingredients) for ingredients in sets], dtype=np.float64)
+    empty = np.zeros(0, dtype=np.int64)
+
+    def hits(ingredients):
+        rows = [postings[ing] for ing in ingredients if ing in postings]
+        return np.bincount(np.concatenate(rows) if rows else empty, minlength=n).astype(np.float64)
+
+    neighbors = []
+    for i, ingredients in enumerate(sets):
+        if not ingredients:
+            neighbors.append([])
+            continue
+        inter = hits(ingredients)
+        scores = inter / np.maximum(sizes[i] + sizes - inter, 1.0)
+        scores += PAIR_BOOST * np.minimum(hits(partners[i]), MAX_PAIR_HITS)
+        scores[(sizes == 0) | (inter == 0)] = 0.0
+        scores[i] = 0.0
+        top = np.argpartition(-scores, min(k, n - 1))[:k + 1] if n > k + 1 else np.arange(n)
+        neighbors.append(_top(scores[top].tolist(), [ids[j] for j in top], k))
+    return neighbors
+
+
+def _lsh_neighbors(sets, partners, ids, k):
+    candidates = lsh_candidates(minhash_signatures(sets))
+    neighbors = []
+    for i, found in enumerate(candidates):
+        found = sorted(found)
+        scores = [pair_score(sets[i], sets[j], partners[i]) for j in found]
+        neighbors.append(_top(scores, [ids[j] for j in found], k))
+    return neighbors
+
+
+def compute_neighbors(recipes, pairs, k=SIMILAR_K):
+    """{recipe id: [(similar id, score), ...]} with the k most similar recipes, best first."""
+    sets = ingredient_sets(recipes)
+    partners = [_partners(ingredients, pairs) for ingredients in sets]
+    ids = [recipe['id'] for recipe in recipes]
+    if len(recipes) <= EXACT_LIMIT:
+        neighbors = _exact_neighbors(sets, partners, ids, k)
+    else:
+        neighbors = _lsh_neighbors(sets, partners, ids, k)
+    return dict(zip(ids, neighbors))
+
+
+def catalog_fingerprint(recipes, k=SIMILAR_K):
+    """Changes whenever a recipe is added, removed or has its ingredients edited."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(k).encode('utf-8'))
+    for recipe in recipes:
+        digest.update(f"{recipe['id']}:{sorted(ingredient_sets([recipe])[0])}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+_build_lock = threading.Lock()
+
+
+def build_similarity_index(pairs, k=SIMILAR_K, force=False):
+    """Recompute and store neighbors if the catalog's ingredients changed; returns True if it rebuilt."""
+    with _build_lock:
+        return _build(pairs, k, force)
+
+
+def _build(pairs, k, force):
+    recipes = get_catalog().get_recipes()
+    fingerprint = catalog_fingerprint(recipes, k)
+    if not force and fingerprint == database.get_similarity_fingerprint():
+        logging.debug("Similarity index is up to date")
+        return False
+    started = time.perf_counter()
+    neighbors = compute_neighbors(recipes, pairs, k)
+    rows = [
+        (recipe_id, rank, similar_id, round(score, 6))
+        for recipe_id, similar in neighbors.items()
+        for rank, (similar_id, score) in enumerate(similar)
+    ]
+    # Unchanged neighbors only need the new fingerprint; rewriting them would make every process reload its catalog
+    changed = rows != database.get_similar_rows()
+    database.store_similar(rows, fingerprint, replace_rows=changed)
+    logging.info(
+        "Similarity index rebuilt for %s recipes (%s neighbors, %s) in %.2fs",
+        len(recipes), len(rows), "changed" if changed else "unchanged", time.perf_counter() - started
+    )
+    return True
+
+
+def _try_lock(path):
+    """An open file holding an exclusive non-blocking lock on path, or None if another process has it."""
+    handle = open(path, 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def start_refresher(pairs, interval=SIMILARITY_REFRESH_INTERVAL, k=SIMILAR_K):
+    """Keep the similarity index current from a daemon thread; interval <= 0 disables it."""
+    if interval <= 0:
+        return None
+
+    def run():
+        lock = None
+        while True:
+            try:
+                # Held for the life of the process; another one takes over on its next cycle if this one exits
+                lock = lock or _try_lock(database.DATABASE_FILE + '.similarity.lock')
+                if lock:
+                    build_similarity_index(pairs, k)
+            except Exception as e:
+                logging.error("Similarity index refresh failed: %s", e, exc_info=True)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="similarity-refresher", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute similar-recipe neighbors.")
+    parser.add_argument('--db', default=database.DATABASE_FILE, help="database file (default: %(default)s)")
+    parser.add_argument('--k', type=int, default=SIMILAR_K, help="neighbors per recipe")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the recipes did not change")
+    args = parser.parse_args(argv)
+
+    database.DATABASE_FILE = args.db
+    database.init_db()
+    rebuilt = build_similarity_index(merge_pairs(FLAVOR_PAIRS, INGREDIENT_PAIRS), args.k, args.force)
+    print("rebuilt" if rebuilt else "up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
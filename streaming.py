@@ -0,0 +1,29 @@
+import json
+import logging
+
+from flask import Response, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_ndjson():
+    """True when the client asked for newline-delimited JSON via ?stream=1 or the Accept header."""
+    if request.args.get("stream", "").lower() in ("1", "true", "ndjson"):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def ndjson_response(items):
+    """Stream each item of an iterable as one JSON line as soon as it is produced.
+
+    An exception while iterating ends the stream with a final {"error": ...} line.
+    """
+    def generate():
+        try:
+            for item in items:
+                yield json.dumps(item, sort_keys=True, separators=(",", ":")) + "\n"
+        except Exception as e:
+            logging.error("Error while streaming response: %s", e, exc_info=True)
+            yield json.dumps({"error": f"Unexpected error: {str(e)}—check the logs!"}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
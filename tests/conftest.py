@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# Importing app creates recipes.db and the cache database in the working directory
+os.chdir(tempfile.mkdtemp(prefix="recipe_tests_"))
+os.environ["SIMILARITY_REFRESH_INTERVAL"] = "0"
+os.environ["LOG_FILE"] = ""
+os.environ["LOG_CONSOLE"] = "0"
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import app
+    app.limiter.enabled = False
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    from services.caching_service import clear_cache
+    clear_cache()
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def cold_snapshot(app_module):
+    """A freshly loaded catalog snapshot with no derived structures built yet."""
+    snapshot_before = app_module.catalog.snapshot()
+    app_module.catalog.refresh(force=True)
+    snapshot = app_module.catalog.snapshot()
+    assert snapshot is not snapshot_before
+    return snapshot
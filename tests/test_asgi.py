@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import asgi
+
+SCOPE = {"type": "http", "method": "GET", "path": "/stream", "query_string": b"", "headers": [], "server": ("testserver", 80)}
+
+
+def counting_app(produced, closed, chunks=1000):
+    def wsgi_app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+
+        def body():
+            try:
+                for i in range(chunks):
+                    produced.append(i)
+                    yield b"line\n"
+            finally:
+                closed.set()
+        return body()
+    return wsgi_app
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_bridge_streams_whole_response(pool):
+    produced, closed = [], threading.Event()
+    bridge = asgi.WSGIBridge(counting_app(produced, closed, chunks=50), pool)
+    sent = []
+
+    requests = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+    async def receive():
+        message = next(requests, None)
+        if message is None:
+            # Like a server, block until the client goes away
+            await asyncio.Event().wait()
+        return message
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(bridge(SCOPE, receive, send))
+    assert sent[0]["status"] == 200
+    assert b"".join(message.get("body", b"") for message in sent[1:]) == b"line\n" * 50
+    assert sent[-1]["more_body"] is False
+    assert closed.is_set()
+
+
+def test_bridge_stops_generator_on_disconnect(pool, monkeypatch):
+    monkeypatch.setattr(asgi, "DISCONNECT_POLL", 0.05)
+    produced, closed = [], threading.Event()
+    bridge = asgi.WSGIBridge(counting_app(produced, closed), pool)
+    sent = []
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        requests = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+        async def receive():
+            message = next(requests, None)
+            if message is not None:
+                return message
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 3:
+                disconnect.set()
+            # A slow client: the handler has to wait for the queue to drain
+            await asyncio.sleep(0.01)
+
+        await bridge(SCOPE, receive, send)
+
+    asyncio.run(scenario())
+    assert closed.wait(5)
+    # The queue bounds how far the handler got ahead of the client before it was stopped
+    assert len(produced) <= len(sent) + asgi.BRIDGE_QUEUE_SIZE + 2
+    assert len(produced) < 1000
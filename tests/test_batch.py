@@ -0,0 +1,31 @@
+def test_mixed_batch(client):
+    response = client.post('/generate_recipes', json={"requests": [
+        {"ingredients": ["tofu"]},
+        {"ingredients": ["chicken"], "preferences": {"isRandom": True}},
+        {"ingredients": "not a list"},
+        {"ingredients": ["mystery spice"]}
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()["recipes"]
+    assert len(results) == 4
+    assert "title" in results[0] and "title" in results[1] and "title" in results[3]
+    assert results[2] == {"error": "Ingredients must be a list"}
+
+
+def test_batch_without_random_items_builds_no_engine(app_module, cold_snapshot, client):
+    response = client.post('/generate_recipes', json={"requests": [{"ingredients": ["tofu"]}]})
+    assert response.status_code == 200
+    assert 'scoring_engine' not in cold_snapshot._derived
+
+
+def test_batch_with_random_item_on_cold_snapshot(app_module, cold_snapshot, client):
+    response = client.post('/generate_recipes', json={"requests": [{"ingredients": ["tofu"], "preferences": {"isRandom": True}}]})
+    assert response.status_code == 200
+    assert 'scoring_engine' in cold_snapshot._derived
+
+
+def test_batch_streams_ndjson(client):
+    response = client.post('/generate_recipes?stream=1', json={"requests": [{"ingredients": ["tofu"]}, {"count": 0}]})
+    lines = response.get_data(as_text=True).splitlines()
+    assert response.mimetype == "application/x-ndjson"
+    assert '"index":0' in lines[0] and '"error"' in lines[-1]
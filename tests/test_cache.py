@@ -0,0 +1,33 @@
+import threading
+
+from services.caching_service import MemoryCacheBackend, RecipeCache
+
+
+def test_counters_under_concurrent_lookups():
+    cache = RecipeCache(MemoryCacheBackend(100, 1024 * 1024))
+    cache.set("hit", {"title": "Tofu Bowl"})
+    threads, lookups = 8, 2000
+
+    def worker():
+        for i in range(lookups):
+            cache.get("hit" if i % 2 else "miss")
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] == stats["misses"] == threads * lookups // 2
+    assert stats["hit_rate"] == 0.5
+
+
+def test_evictions_counted():
+    cache = RecipeCache(MemoryCacheBackend(2, 1024 * 1024))
+    for i in range(5):
+        cache.set(f"key {i}", i)
+    assert cache.get("key 4") == 4
+    assert cache.get("key 0") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 3
+    assert stats["entries"] == 2
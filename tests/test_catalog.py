@@ -0,0 +1,68 @@
+import json
+import pickle
+import threading
+
+import pytest
+
+from recipe_catalog import CatalogSnapshot, FrozenDict
+
+RECIPES = (
+    {'id': 1, 'title_en': 'Tofu', 'ingredients': ['tofu', 'ginger']},
+    {'id': 2, 'title_en': 'Chicken', 'ingredients': ['chicken', 'lime']},
+)
+
+
+def run_with_timeout(fn, timeout=10):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "derived() deadlocked"
+    return result['value']
+
+
+def test_derived_builds_once():
+    snapshot = CatalogSnapshot(1, RECIPES)
+    calls = []
+
+    def builder(recipes):
+        calls.append(1)
+        return len(recipes)
+
+    assert snapshot.derived('count', builder) == 2
+    assert snapshot.derived('count', builder) == 2
+    assert len(calls) == 1
+
+
+def test_nested_derived_does_not_deadlock():
+    snapshot = CatalogSnapshot(1, RECIPES)
+
+    def outer(recipes):
+        return snapshot.derived('inner', lambda r: [recipe['id'] for recipe in r]) + [0]
+
+    assert run_with_timeout(lambda: snapshot.derived('outer', outer)) == [1, 2, 0]
+
+
+def test_scoring_engine_on_cold_snapshot(app_module, cold_snapshot):
+    engine = run_with_timeout(app_module.get_scoring_engine)
+    assert engine is cold_snapshot.derived('scoring_engine', None)
+    assert engine.top(['tofu'], 1)
+
+
+def test_random_sampler_on_cold_snapshot(app_module, cold_snapshot):
+    sampler = run_with_timeout(app_module.get_random_sampler)
+    assert len(sampler) == len(app_module.get_random_candidates())
+
+
+def test_catalog_recipes_are_read_only(app_module):
+    recipe = app_module.catalog.get_recipes()[0]
+    assert isinstance(recipe, FrozenDict) and isinstance(recipe['nutrition'], FrozenDict)
+    assert isinstance(recipe['ingredients'], tuple)
+    with pytest.raises(TypeError):
+        recipe['title_en'] = 'Changed'
+    with pytest.raises(TypeError):
+        recipe['nutrition'].update(calories=0)
+    copy = {**recipe, 'title_en': 'Changed'}
+    assert copy['title_en'] == 'Changed' and recipe['title_en'] != 'Changed'
+    assert json.loads(json.dumps(recipe))['ingredients'] == list(recipe['ingredients'])
+    assert pickle.loads(pickle.dumps(recipe)) == recipe
@@ -0,0 +1,148 @@
+import json
+import random
+import sqlite3
+
+import pytest
+
+import database
+from recipe_import import to_row, validate_recipe
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """A seeded database of its own, so schema tests never touch the app's."""
+    monkeypatch.setattr(database, "DATABASE_FILE", str(tmp_path / "recipes.db"))
+    database.init_db()
+    return database.DATABASE_FILE
+
+
+BASELINE_SCHEMA = """
+    CREATE TABLE recipes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title_en TEXT NOT NULL,
+        title_es TEXT NOT NULL,
+        steps_en TEXT NOT NULL,
+        steps_es TEXT NOT NULL,
+        ingredients TEXT NOT NULL,
+        nutrition TEXT NOT NULL,
+        cooking_time INTEGER NOT NULL,
+        difficulty TEXT NOT NULL,
+        rating REAL DEFAULT 0.0,
+        rating_count INTEGER DEFAULT 0
+    )
+"""
+
+
+def recipe(title, ingredients, calories=300):
+    return {
+        "title_en": title, "title_es": title,
+        "steps_en": ["Cook it."], "steps_es": ["Cocinar."],
+        "ingredients": ingredients,
+        "nutrition": {"calories": calories, "protein": 10, "fat": 5},
+        "cooking_time": 20, "difficulty": "easy"
+    }
+
+
+def schema_objects(conn):
+    return {tuple(row) for row in conn.execute("SELECT type, name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+
+
+def test_migrates_baseline_database(tmp_path, monkeypatch):
+    path = str(tmp_path / "recipes.db")
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.execute(
+        "INSERT INTO recipes (title_en, title_es, steps_en, steps_es, ingredients, nutrition, cooking_time, difficulty) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ("Old Stew", "Guiso", "[]", "[]", json.dumps(["beef", "onion"]), json.dumps({"calories": 450, "protein": 30, "fat": 20}), 60, "medium")
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(database, "DATABASE_FILE", path)
+    database.init_db()
+    with database.get_db_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION == len(database.MIGRATIONS)
+        row = conn.execute("SELECT id, calories, protein, fat FROM recipes WHERE title_en = 'Old Stew'").fetchone()
+        assert tuple(row)[1:] == (450, 30, 20)
+        ingredients = {r[0] for r in conn.execute("SELECT ingredient FROM recipe_ingredients WHERE recipe_id = ?", (row[0],))}
+        assert ingredients == {"beef", "onion"}
+    # Running it again is a no-op
+    database.init_db()
+
+
+def test_bulk_insert_restores_deferred_triggers_and_indexes(fresh_db):
+    with database.get_db_connection() as conn:
+        before = schema_objects(conn)
+        assert {name for kind, name in before if kind == 'trigger'} >= {
+            database._trigger_name(statement)
+            for statement in database.RECIPE_INGREDIENT_TRIGGERS + database.RECIPE_FTS_TRIGGERS + database.CATALOG_VERSION_TRIGGERS
+        }
+        assert {name for kind, name in before if kind == 'index'} >= set(database.RECIPE_INDEXES)
+        version = database.get_catalog_version(conn)
+        rows = [to_row(validate_recipe(recipe("Zucchini Boats", ["zucchini", "feta"])))]
+        assert database.bulk_insert_recipes(conn, [rows], defer_indexes=True) == 1
+        assert schema_objects(conn) == before
+        assert database.get_catalog_version(conn) == version + 1
+        new_id = conn.execute("SELECT id FROM recipes WHERE title_en = 'Zucchini Boats'").fetchone()[0]
+        assert {r[0] for r in conn.execute("SELECT ingredient FROM recipe_ingredients WHERE recipe_id = ?", (new_id,))} == {"zucchini", "feta"}
+    assert [r['id'] for r in database.search_recipes("zucchini")[1]] == [new_id]
+    # The recreated triggers keep working for later writes
+    with database.get_db_connection() as conn:
+        conn.execute("UPDATE recipes SET ingredients = ? WHERE id = ?", (json.dumps(["squash"]), new_id))
+        assert [r[0] for r in conn.execute("SELECT ingredient FROM recipe_ingredients WHERE recipe_id = ?", (new_id,))] == ["squash"]
+
+
+def test_random_recipe_survives_gaps_and_empty_table(fresh_db):
+    with database.get_db_connection() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM recipes ORDER BY id")]
+        conn.execute("DELETE FROM recipes WHERE id NOT IN (?, ?)", (ids[0], ids[-1]))
+    rng = random.Random(3)
+    assert {database.get_random_recipe(rng)['id'] for _ in range(50)} == {ids[0], ids[-1]}
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM recipes")
+    assert database.get_random_recipe(rng) is None
+
+
+def search_ids(text):
+    return [result['id'] for result in database.search_recipes(text)[1]]
+
+
+def test_search_follows_updates_and_deletes(fresh_db):
+    with database.get_db_connection() as conn:
+        cursor = conn.execute(
+            f"INSERT INTO recipes ({', '.join(database.RECIPE_COLUMNS)}) VALUES ({', '.join('?' for _ in database.RECIPE_COLUMNS)})",
+            to_row(validate_recipe(recipe("Kohlrabi Slaw", ["kohlrabi", "vinegar"])))
+        )
+        recipe_id = cursor.lastrowid
+    assert search_ids("kohlrabi") == [recipe_id]
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "UPDATE recipes SET title_en = ?, title_es = ?, ingredients = ? WHERE id = ?",
+            ("Celeriac Slaw", "Ensalada de Apio", json.dumps(["celeriac", "vinegar"]), recipe_id)
+        )
+    assert search_ids("kohlrabi") == []
+    assert search_ids("celeriac") == [recipe_id]
+
+    # A rating update leaves the indexed text alone
+    with database.get_db_connection() as conn:
+        conn.execute("UPDATE recipes SET rating = 5, rating_count = 1 WHERE id = ?", (recipe_id,))
+    assert search_ids("celeriac") == [recipe_id]
+
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM recipes WHERE id = ?", (recipe_id,))
+    assert search_ids("celeriac") == []
+    assert database.search_recipes("celeriac")[0] == 0
+
+
+def test_search_endpoint_follows_updates(app_module, client):
+    with database.get_db_connection() as conn:
+        recipe_id, title = conn.execute("SELECT id, title_en FROM recipes ORDER BY id LIMIT 1").fetchone()
+        conn.execute("UPDATE recipes SET title_en = ? WHERE id = ?", ("Rutabaga Mash", recipe_id))
+    try:
+        results = client.get('/search?q=rutabaga').get_json()["results"]
+        assert [result['id'] for result in results] == [recipe_id]
+    finally:
+        with database.get_db_connection() as conn:
+            conn.execute("UPDATE recipes SET title_en = ? WHERE id = ?", (title, recipe_id))
+    assert client.get('/search?q=rutabaga').get_json()["results"] == []
@@ -0,0 +1,15 @@
+def test_seeded_get_is_publicly_cacheable(client):
+    response = client.get('/generate_recipe?ingredients=tofu&seed=7')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=3600'
+    again = client.get('/generate_recipe?ingredients=tofu&seed=7', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_seeded_post_is_not_publicly_cacheable(client):
+    response = client.post('/generate_recipe', json={"ingredients": ["tofu"], "seed": 7})
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert 'public' not in response.headers['Cache-Control']
+    again = client.post('/generate_recipe', json={"ingredients": ["tofu"], "seed": 7}, headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 200
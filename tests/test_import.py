@@ -0,0 +1,32 @@
+import types
+
+import database
+import recipe_import
+from recipe_import import import_recipes
+
+
+def recipe(title, ingredients):
+    return {
+        "title_en": title, "title_es": title,
+        "steps_en": ["Cook."], "steps_es": ["Cocinar."],
+        "ingredients": ingredients,
+        "nutrition": {"calories": 300, "protein": 10, "fat": 5},
+        "cooking_time": 20, "difficulty": "easy"
+    }
+
+
+def test_import_report_counts_and_rate(app_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_FILE", str(tmp_path / "import.db"))
+    database.init_db()
+    records = [recipe("Tofu Bowl", ["tofu", "rice"]), recipe("Tofu Bowl", ["rice", "tofu"]), {"title_en": "broken"}]
+    records += [recipe(f"Soup {i}", ["water", f"thing {i}"]) for i in range(20)]
+    # The import starts at t=0 and finishes at t=3
+    clock = iter([0.0, 3.0])
+    monkeypatch.setattr(recipe_import, "time", types.SimpleNamespace(perf_counter=lambda: next(clock)))
+    report = import_recipes(records)
+    assert report['read'] == 23
+    assert report['imported'] == 21
+    assert report['duplicates'] == 1
+    assert report['invalid'] == 1
+    # The rate is inserted rows per second, not records read
+    assert report['rows_per_sec'] == 7
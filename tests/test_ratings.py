@@ -0,0 +1,87 @@
+import random
+
+import database
+import ratings
+from ratings import RatingBuffer, rating_weight
+from recipe_catalog import RatingTable
+
+
+def test_rating_weight_shrinks_towards_prior():
+    assert rating_weight(0.0, 0) == ratings.PRIOR_MEAN
+    assert ratings.PRIOR_MEAN < rating_weight(5.0, 2) < rating_weight(5.0, 50) < 5.0
+
+
+def test_flush_keeps_pending_on_any_error(monkeypatch):
+    buffer = RatingBuffer(flush_interval=3600)
+    buffer.add(1, 5.0)
+    buffer.add(1, 3.0)
+
+    def broken():
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(database, 'get_db_connection', broken)
+    assert buffer.flush() == 0
+    assert buffer.pending_for(1) == (8.0, 2)
+    assert buffer.stats()["errors"] == 1
+
+
+def test_flush_writes_running_mean(app_module):
+    recipe = app_module.catalog.snapshot().recipes[0]
+    with database.get_db_connection() as conn:
+        conn.execute("UPDATE recipes SET rating = 4.0, rating_count = 2 WHERE id = ?", (recipe['id'],))
+    buffer = RatingBuffer(flush_interval=3600)
+    buffer.add(recipe['id'], 1.0)
+    assert buffer.flush() == 1
+    with database.get_db_connection() as conn:
+        rating, count = conn.execute("SELECT rating, rating_count FROM recipes WHERE id = ?", (recipe['id'],)).fetchone()
+    assert (rating, count) == (3.0, 3)
+
+
+def test_live_rating_folds_in_pending(monkeypatch):
+    buffer = RatingBuffer(flush_interval=3600)
+    monkeypatch.setattr(ratings, 'rating_buffer', buffer)
+    buffer.add(7, 5.0)
+    assert ratings.live_rating(7, 3.0, 1) == (4.0, 2)
+    assert ratings.live_rating(8, 3.0, 1) == (3.0, 1)
+
+
+def test_pick_rated_ignores_stale_core_ratings(app_module, monkeypatch):
+    good, bad = app_module.catalog.snapshot().recipes[:2]
+    live = RatingTable(2, {good['id']: (5.0, 1000), bad['id']: (1.0, 1000)})
+    monkeypatch.setattr(app_module.catalog, 'snapshot', lambda: type('Snapshot', (), {'ratings': live})())
+    # The cached cores still claim the opposite ratings
+    cores = [{'id': good['id'], 'rating': 1.0, 'rating_count': 1000}, {'id': bad['id'], 'rating': 5.0, 'rating_count': 1000}]
+    rng = random.Random(1)
+    picks = [app_module.pick_rated(cores, rng)['id'] for _ in range(500)]
+    assert picks.count(good['id']) > picks.count(bad['id'])
+
+
+def test_flush_keeps_the_catalog_snapshot(app_module):
+    catalog = app_module.catalog
+    # Pick up any content changes made by earlier tests first
+    catalog._next_check = 0.0
+    snapshot = catalog.snapshot()
+    engine = app_module.get_scoring_engine()
+    sampler = app_module.get_random_sampler()
+    recipe_id = snapshot.recipes[0]['id']
+    _, count = database.get_ratings()[recipe_id]
+    buffer = RatingBuffer(flush_interval=3600)
+    buffer.add(recipe_id, 5.0)
+    assert buffer.flush() == 1
+    catalog._next_check = 0.0
+    assert catalog.snapshot() is snapshot
+    assert snapshot.version == catalog.snapshot().version
+    assert snapshot.ratings.get(recipe_id)[1] == (count or 0) + 1
+    assert app_module.get_scoring_engine() is engine
+    # The rating-weighted sampler follows the new ratings
+    assert app_module.get_random_sampler() is not sampler
+
+
+def test_content_change_reloads_the_catalog(app_module):
+    catalog = app_module.catalog
+    catalog._next_check = 0.0
+    snapshot = catalog.snapshot()
+    with database.get_db_connection() as conn:
+        conn.execute("UPDATE recipes SET cooking_time = cooking_time WHERE id = ?", (snapshot.recipes[0]['id'],))
+    catalog._next_check = 0.0
+    assert catalog.snapshot().version == snapshot.version + 1
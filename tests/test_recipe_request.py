@@ -0,0 +1,45 @@
+import pytest
+
+from recipe_request import RecipeRequestError, canonicalize_request, normalize_ingredients, payload_from_args
+
+
+def test_normalize_keeps_order_and_dedupes():
+    assert normalize_ingredients([' Tofu', 'chicken', 'tofu', '']) == ['tofu', 'chicken']
+
+
+def test_ingredient_order_is_part_of_the_key():
+    first = canonicalize_request({"ingredients": ["tofu", "chicken"]})
+    second = canonicalize_request({"ingredients": ["chicken", "tofu"]})
+    assert first.ingredients == ["tofu", "chicken"]
+    assert first.key != second.key
+
+
+def test_equivalent_requests_share_a_key():
+    first = canonicalize_request({"ingredients": ["Tofu ", "tofu", "ginger"], "preferences": {"unused": 1}})
+    second = canonicalize_request({"ingredients": ["tofu", "ginger"], "preferences": {}})
+    assert first.key == second.key
+
+
+def test_get_seed_matches_json_seed():
+    from_get = canonicalize_request(payload_from_args({"ingredients": "tofu", "seed": "7"}))
+    from_json = canonicalize_request({"ingredients": ["tofu"], "seed": 7})
+    assert from_get.seed == from_json.seed == 7
+    assert from_get.key == from_json.key
+
+
+@pytest.mark.parametrize("payload, message", [
+    (None, "Invalid or missing JSON payload"),
+    ([], "Payload must be a JSON object"),
+    ({"ingredients": "tofu"}, "Ingredients must be a list"),
+    ({"ingredients": [1]}, "Ingredients must be a list of strings"),
+    ({"count": 0}, "Count must be an integer"),
+    ({"seed": 1.5}, "Seed must be"),
+])
+def test_invalid_requests(payload, message):
+    with pytest.raises(RecipeRequestError, match=message):
+        canonicalize_request(payload)
+
+
+def test_dynamic_recipe_uses_first_ingredient(client):
+    response = client.post('/generate_recipe', json={"ingredients": ["mystery root", "other thing"], "seed": 1})
+    assert "mystery root" in response.get_json()["ingredients"][0].lower()
@@ -0,0 +1,30 @@
+import random
+
+from sampling import AliasSampler
+
+
+def test_sample_follows_weights():
+    sampler = AliasSampler(['a', 'b', 'c'], [1, 3, 0])
+    rng = random.Random(7)
+    counts = {'a': 0, 'b': 0, 'c': 0}
+    for _ in range(20000):
+        counts[sampler.sample(rng)] += 1
+    assert counts['c'] == 0
+    assert 0.70 < counts['b'] / 20000 < 0.80
+
+
+def test_seeded_draws_are_reproducible():
+    sampler = AliasSampler(range(10), range(1, 11))
+    assert [sampler.sample(random.Random(3)) for _ in range(5)] == [sampler.sample(random.Random(3)) for _ in range(5)]
+
+
+def test_sample_distinct_returns_unique_items():
+    sampler = AliasSampler(range(10), [1] * 10)
+    picked = sampler.sample_distinct(random.Random(1), 4)
+    assert len(picked) == len(set(picked)) <= 4
+    assert sorted(sampler.sample_distinct(random.Random(1), 20)) == list(range(10))
+
+
+def test_sampler_uses_one_snapshot(app_module, cold_snapshot):
+    sampler = app_module.get_random_sampler()
+    assert set(id(r) for r in sampler.items) <= set(id(r) for r in cold_snapshot.recipes)
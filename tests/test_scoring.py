@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import Future
+
+from scoring import ScoringEngine
+from scoring_pool import ScoringPool
+
+RECIPES = [
+    {'id': 1, 'ingredients': ['tofu', 'ginger', 'soy sauce']},
+    {'id': 2, 'ingredients': ['chicken', 'lime']},
+    {'id': 3, 'ingredients': ['chicken thighs', 'garlic']},
+]
+
+
+def test_engine_matches_score_recipe(app_module):
+    engine = ScoringEngine(RECIPES, app_module.INGREDIENT_PAIRS)
+    for query in (['chicken'], ['tofu', 'garlic'], ['salmon']):
+        assert engine.scores(query).tolist() == [app_module.score_recipe(r, query, {}) for r in RECIPES]
+    assert [r['id'] for r in engine.top(['chicken'], 2)] == [2, 3]
+
+
+class StuckExecutor:
+    """Accepts work that starts running and never finishes on its own."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.futures.append(future)
+        return future
+
+
+def test_overdue_tasks_shed_load_until_they_finish(monkeypatch):
+    pool = ScoringPool(1, {}, deadline=0.01)
+    executor = StuckExecutor()
+    monkeypatch.setattr(pool, '_pool', lambda: executor)
+
+    assert pool.rank(['tofu']) is None
+    assert pool.timeouts == 1
+    # The only worker is still busy with the overdue task: fall back without submitting
+    assert pool.rank(['tofu']) is None
+    assert pool.shed == 1 and len(executor.futures) == 1
+
+    executor.futures[0].set_result([1])
+    executor_result = Future()
+    executor_result.set_result([2])
+    monkeypatch.setattr(executor, 'submit', lambda fn, *args: executor_result)
+    assert pool.rank(['tofu']) == [2]
+
+
+def test_counters_are_exact_under_concurrent_timeouts(monkeypatch):
+    threads, calls = 8, 25
+    pool = ScoringPool(threads * calls, {}, deadline=0.001)
+    executor = StuckExecutor()
+    monkeypatch.setattr(pool, '_pool', lambda: executor)
+
+    def worker():
+        for _ in range(calls):
+            pool.rank(['tofu'])
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert pool.timeouts == pool._overdue == threads * calls
+    for future in executor.futures:
+        future.set_result([1])
+    assert pool._overdue == 0
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import database
+import similarity
+from similarity import compute_neighbors, pair_score
+
+RECIPES = [
+    {'id': 1, 'ingredients': ['tofu', 'ginger', 'soy sauce']},
+    {'id': 2, 'ingredients': ['tofu', 'ginger', 'garlic']},
+    {'id': 3, 'ingredients': ['sesame oil', 'chili']},
+    {'id': 4, 'ingredients': []},
+]
+PAIRS = similarity.merge_pairs({'tofu': ['sesame oil', 'chili'], 'ginger': ['chili']})
+
+
+def test_pair_boost_alone_is_not_similar():
+    sets = similarity.ingredient_sets(RECIPES)
+    partners = similarity._partners(sets[0], PAIRS)
+    assert pair_score(sets[0], sets[2], partners) == 0.0
+    assert pair_score(sets[0], sets[1], partners) > 0.0
+
+
+def test_exact_and_lsh_neighbors_share_ingredients(monkeypatch):
+    for limit in (10, 0):
+        monkeypatch.setattr(similarity, 'EXACT_LIMIT', limit)
+        neighbors = compute_neighbors(RECIPES, PAIRS, k=5)
+        assert [similar_id for similar_id, _ in neighbors[1]] == [2]
+        assert neighbors[3] == [] and neighbors[4] == []
+
+
+def test_unchanged_rebuild_keeps_rows(app_module, monkeypatch):
+    assert similarity.build_similarity_index(PAIRS, force=True)
+    rows = database.get_similar_rows()
+    stored = []
+    monkeypatch.setattr(database, 'store_similar', lambda r, fp, replace_rows=True: stored.append(replace_rows))
+    assert similarity.build_similarity_index(PAIRS, force=True)
+    assert stored == [False]
+    assert database.get_similar_rows() == rows
+
+
+def test_refresh_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / 'recipes.db.similarity.lock')
+    first = similarity._try_lock(path)
+    assert first is not None
+    if os.name != 'nt':
+        # flock is per open file description, so a second open in this process is refused like another process would be
+        assert similarity._try_lock(path) is None
+    first.close()
+    assert similarity._try_lock(path) is not None
+
+
+def test_cli_builds_without_importing_app(tmp_path):
+    script = (
+        "import sys, similarity\n"
+        "similarity.main(['--db', sys.argv[1]])\n"
+        "similarity.main(['--db', sys.argv[1]])\n"
+        "print('app' in sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path / "cli.db")],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["rebuilt", "up", "to", "date", "False"]
@@ -0,0 +1,24 @@
+import random
+
+import metrics
+
+
+def stage_count(name):
+    return sum(sum(counts) for labels, (counts, _) in metrics.stage_histogram.snapshot().items() if labels[0] == name)
+
+
+def test_no_picks_fails_the_same_with_and_without_streaming(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'plan_recipes', lambda recipe_request, engine=None: (random, 'random', [], False))
+    plain = client.post('/generate_recipe', json={"ingredients": ["tofu"]})
+    streamed = client.post('/generate_recipe?stream=1', json={"ingredients": ["tofu"]})
+    assert plain.status_code == streamed.status_code == 500
+    assert streamed.mimetype == "application/json"
+    assert plain.get_json() == streamed.get_json()
+
+
+def test_streamed_decorate_time_is_recorded(client):
+    before = stage_count('decorate')
+    response = client.post('/generate_recipe?stream=1', json={"ingredients": ["tofu"]})
+    assert response.mimetype == "application/x-ndjson"
+    assert len(response.get_data(as_text=True).splitlines()) == 1
+    assert stage_count('decorate') == before + 1